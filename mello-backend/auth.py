@@ -1,13 +1,35 @@
+import logging
+import re
+import time
+from typing import NamedTuple, Optional
+
 import firebase_admin
-from database import get_db
+from database import SessionLocal, get_db
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from firebase_admin import auth
 from firebase_config import initialize_firebase
+from metrics import firebase_verify_duration
 from models import User, UserRole
 from sqlalchemy.orm import Session
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+def verify_token(token: str) -> dict:
+    """Verify a Firebase ID token, timing the check for metrics"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        decoded_token = auth.verify_id_token(token)
+        outcome = "valid"
+        return decoded_token
+    except (auth.ExpiredIdTokenError, auth.InvalidIdTokenError):
+        outcome = "invalid"
+        raise
+    finally:
+        firebase_verify_duration.observe((outcome,), time.perf_counter() - started)
 
 
 async def get_current_user(
@@ -28,7 +50,7 @@ async def get_current_user(
                 )
 
         # Verify the Firebase token
-        decoded_token = auth.verify_id_token(credentials.credentials)
+        decoded_token = verify_token(credentials.credentials)
         firebase_uid = decoded_token["uid"]
 
         # Get user from database
@@ -89,3 +111,50 @@ async def get_user_or_counselor(current_user: User = Depends(get_current_user))
             detail="User or counselor access required",
         )
     return current_user
+
+
+class StreamUser(NamedTuple):
+    id: int
+    role: UserRole
+
+
+async def get_stream_user(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> StreamUser:
+    """Authenticate from the header or a ?token= query parameter
+
+    Browser EventSource connections can't set an Authorization header. The
+    session is closed before returning: a Depends(get_db) session would only
+    be released when the stream ends, holding a pooled connection for as
+    long as the dashboard stays open.
+    """
+    if credentials is None:
+        if not token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    db = SessionLocal()
+    try:
+        user = await get_current_user(credentials, db)
+        return StreamUser(user.id, user.role)
+    finally:
+        db.close()
+
+
+_TOKEN_PARAM = re.compile(r"([?&]token=)[^&\s]*")
+
+
+class RedactTokenFilter(logging.Filter):
+    """Keep ?token= credentials out of uvicorn's access log"""
+
+    def filter(self, record):
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                _TOKEN_PARAM.sub(r"\1[redacted]", arg) if isinstance(arg, str) else arg
+                for arg in record.args
+            )
+        return True
@@ -0,0 +1,106 @@
+"""
+End-to-end load test of the chat endpoint against the offline stub model.
+
+Starts the API in-process with LLM_PROVIDER=stub and fires concurrent
+POST /api/chat/ requests, then prints throughput and latency percentiles.
+
+    python bench_chat.py --requests 2000 --concurrency 50 --latency uniform:0.2,0.8
+
+Pass --student-id to also exercise chat log persistence (needs a database).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+MESSAGES = [
+    "How can I sleep better before exams?",
+    "I feel really stressed about my assignments",
+    "I get nervous when I have to present in class",
+    "I've been feeling lonely since moving to the hostel",
+    "Any tips for managing my time this semester?",
+    "परीक्षा से पहले बहुत तनाव हो रहा है",
+]
+
+
+def percentile(sorted_values, pct):
+    index = min(
+        len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", default="lognormal:-1.2,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--unique",
+        action="store_true",
+        help="make every message unique (no cache hits)",
+    )
+    parser.add_argument("--student-id", default=None)
+    args = parser.parse_args()
+
+    os.environ["LLM_PROVIDER"] = "stub"
+    os.environ["STUB_LLM_LATENCY"] = args.latency
+    os.environ["STUB_LLM_ERROR_RATE"] = str(args.error_rate)
+
+    import uvicorn
+    from main import app
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    url = f"http://127.0.0.1:{args.port}/api/chat/"
+
+    def send(i):
+        message = MESSAGES[i % len(MESSAGES)]
+        if args.unique:
+            message = f"{message} ({i})"
+        body = json.dumps({"message": message, "student_id": args.student_id})
+        request = urllib.request.Request(
+            url, data=body.encode(), headers={"Content-Type": "application/json"}
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                ok = response.status == 200
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - started
+    server.should_exit = True
+
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for ok, _ in results if not ok)
+    print(f"requests:    {args.requests} ({errors} errors)")
+    print(f"concurrency: {args.concurrency}, stub latency: {args.latency}")
+    print(f"throughput:  {args.requests / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(
+        "latency ms:  "
+        f"mean {statistics.mean(latencies) * 1000:.1f}, "
+        f"p50 {percentile(latencies, 50) * 1000:.1f}, "
+        f"p95 {percentile(latencies, 95) * 1000:.1f}, "
+        f"p99 {percentile(latencies, 99) * 1000:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
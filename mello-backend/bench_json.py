@@ -0,0 +1,82 @@
+"""
+Benchmark of JSON rendering for list-heavy endpoints.
+
+Builds appointment-like rows (datetimes, enums, None, Hindi text) and times
+three ways of turning them into a response body:
+
+- stdlib: FastAPI's old default, jsonable_encoder then json.dumps
+- default: jsonable_encoder then FastJSONResponse (the new app default)
+- direct: an endpoint returning FastJSONResponse itself
+
+All three must produce identical bytes.
+
+    python bench_json.py --rows 1000 10000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from models import UserRole
+from responses import FastJSONResponse
+
+
+def make_rows(count):
+    created = datetime(2026, 1, 1, 9, 30, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "user_name": f"Student {i}",
+            "user_email": f"student{i}@college.edu",
+            "role": UserRole.USER,
+            "counselor_name": "डॉ. शर्मा" if i % 2 else "Dr. Rao",
+            "counselor_specialization": None if i % 5 == 0 else "Anxiety",
+            "preferred_datetime": datetime(2026, 2, 1, 10, 0) + timedelta(hours=i),
+            "status": "pending",
+            "issue_description": "Exam stress and trouble sleeping " * 3,
+            "urgency": "medium",
+            "rating": 4.5,
+            "created_at": created + timedelta(seconds=i, microseconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+RENDERERS = {
+    "stdlib": lambda rows: JSONResponse(jsonable_encoder(rows)).body,
+    "default": lambda rows: FastJSONResponse(jsonable_encoder(rows)).body,
+    "direct": lambda rows: FastJSONResponse(rows).body,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for count in args.rows:
+        rows = make_rows(count)
+        bodies = {name: render(rows) for name, render in RENDERERS.items()}
+        assert len(set(bodies.values())) == 1, "renderers disagree"
+        size_mb = len(bodies["stdlib"]) / 1e6
+
+        print(f"{count} rows, {size_mb:.2f} MB per response")
+        baseline = None
+        for name, render in RENDERERS.items():
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                render(rows)
+            per_call = (time.perf_counter() - started) / args.repeat
+            baseline = baseline or per_call
+            print(
+                f"  {name:>8}: {per_call * 1000:8.2f} ms  "
+                f"{count / per_call:>10.0f} rows/s  "
+                f"{size_mb / per_call:7.1f} MB/s  x{baseline / per_call:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Micro-benchmark of chat pre-processing and prompt assembly.
+
+Runs the per-request work done before the model call (classify, normalise,
+measure, pack the prompt with conversation history) on a mix of English,
+Hindi and long messages, from several threads at once, and compares the
+single-pass pipeline with running each stage on the raw message.
+
+    python bench_prompt.py --iterations 20000 --threads 8 --turns 10
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from chat_lexicon import classify_message
+from chat_pipeline import prepare_message
+from conversation import pack_prompt
+from fallback_responder import detect_language
+from response_cache import normalize_message
+from routers.chat import SYSTEM_PROMPT
+
+MESSAGES = [
+    "How can I sleep better before exams?",
+    "I feel really stressed about my assignments, deadlines keep piling up!!",
+    "परीक्षा से पहले बहुत तनाव हो रहा है, नींद भी नहीं आती",
+    "mujhe bahut tension ho rahi hai exams ko lekar",
+    "I can't cope anymore, everything feels hopeless and I'm so tired " * 6,
+]
+
+
+def separate_stages(message, turns):
+    category, scores, escalate = classify_message(message)
+    normalize_message(message)
+    detect_language(message)
+    return pack_prompt(SYSTEM_PROMPT, turns, message)
+
+
+def single_pass(message, turns):
+    prepared = prepare_message(message)
+    return pack_prompt(
+        SYSTEM_PROMPT, turns, prepared.text, message_tokens=prepared.tokens
+    )
+
+
+def run(stage, iterations, threads, turns):
+    per_thread = iterations // threads
+    latencies = [[] for _ in range(threads)]
+
+    def worker(index):
+        samples = latencies[index]
+        for i in range(per_thread):
+            message = MESSAGES[(i + index) % len(MESSAGES)]
+            started = time.perf_counter()
+            stage(message, turns)
+            samples.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = sorted(sample for thread in latencies for sample in thread)
+    return {
+        "ops": len(samples) / elapsed,
+        "mean": statistics.mean(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    turns = [
+        (MESSAGES[i % len(MESSAGES)], f"Here is some supportive advice, part {i}. " * 4)
+        for i in range(args.turns)
+    ]
+    # Warm up the lexicon and the per-turn caches
+    for message in MESSAGES:
+        single_pass(message, turns)
+
+    print(f"{args.iterations} requests, {args.threads} threads, {args.turns} turns")
+    for name, stage in (("separate", separate_stages), ("single", single_pass)):
+        result = run(stage, args.iterations, args.threads, turns)
+        print(
+            f"{name:>9}: {result['ops']:>9.0f} req/s  "
+            f"mean {result['mean'] * 1e6:.1f}us  "
+            f"p50 {result['p50'] * 1e6:.1f}us  p99 {result['p99'] * 1e6:.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
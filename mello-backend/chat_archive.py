@@ -0,0 +1,215 @@
+"""
+Retention for chatbot_logs: daily rollups plus archiving of cold rows.
+
+Dashboards read per-day, per-category counts from ``chat_daily_rollups`` and
+only scan raw logs for days that haven't been rolled up yet, so they keep
+working after old rows are archived. The archive job rolls up every closed
+day (recounting the last few so late rows are not missed), then moves rows
+older than the retention window into gzipped JSONL files, one per month, and
+deletes them from the table. Rows are never archived before their day has
+been rolled up. Days are UTC days, matching how log timestamps are written.
+
+Run it daily, e.g. from cron shortly after midnight UTC:
+
+    python chat_archive.py --retention-days 180
+
+- ``CHAT_LOG_RETENTION_DAYS``: days of raw logs to keep (default 180)
+- ``CHAT_ARCHIVE_DIR``: where archive files go (default ``archive``)
+- ``CHAT_ROLLUP_REFRESH_DAYS``: closed days recounted on each run (default 7)
+"""
+
+import argparse
+import gzip
+import json
+import os
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+
+from models import ChatbotLog, ChatDailyRollup
+from sqlalchemy import func, insert
+
+RETENTION_DAYS = int(os.getenv("CHAT_LOG_RETENTION_DAYS", "180"))
+ARCHIVE_DIR = os.getenv("CHAT_ARCHIVE_DIR", "archive")
+ARCHIVE_BATCH_SIZE = 5000
+ROLLUP_REFRESH_DAYS = int(os.getenv("CHAT_ROLLUP_REFRESH_DAYS", "7"))
+
+
+def _start_of(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _as_date(value) -> date:
+    # func.date() gives a date on MySQL and a string on SQLite
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def utc_today() -> date:
+    """Today's date in UTC, the time base chat log timestamps are written in"""
+    return datetime.now(timezone.utc).date()
+
+
+def refresh_rollups(db, today=None, refresh_days: int = ROLLUP_REFRESH_DAYS) -> int:
+    """Recompute rollups for the trailing window of closed days; returns rows written
+
+    Days already rolled up are recounted for `refresh_days` back so rows that
+    land late (batched writes, replayed dead letters) still make it into the
+    rollups; anything after the last rolled-up day is always included.
+    """
+    today = today or utc_today()
+    last_day = db.query(func.max(ChatDailyRollup.day)).scalar()
+    start = None
+    if last_day is not None:
+        start = min(today - timedelta(days=refresh_days), last_day + timedelta(days=1))
+
+    day = func.date(ChatbotLog.timestamp)
+    query = db.query(day, ChatbotLog.category, func.count(ChatbotLog.id)).filter(
+        ChatbotLog.timestamp < _start_of(today)
+    )
+    if start is not None:
+        query = query.filter(ChatbotLog.timestamp >= _start_of(start))
+
+    counts = Counter()
+    for log_day, category, count in query.group_by(day, ChatbotLog.category):
+        counts[(_as_date(log_day), category or "general")] += count
+
+    # Replace the window in one transaction so readers never see it half-done
+    if start is not None:
+        db.query(ChatDailyRollup).filter(
+            ChatDailyRollup.day >= start, ChatDailyRollup.day < today
+        ).delete(synchronize_session=False)
+    if counts:
+        db.execute(
+            insert(ChatDailyRollup),
+            [
+                {"day": log_day, "category": category, "count": count}
+                for (log_day, category), count in counts.items()
+            ],
+        )
+    db.commit()
+    return len(counts)
+
+
+def chat_counts(db, since=None) -> Counter:
+    """Chat counts keyed by (day, category) from rollups plus live logs
+
+    `since` is a date; counts cover whole days from it onwards.
+    """
+    counts = Counter()
+    rollups = db.query(
+        ChatDailyRollup.day, ChatDailyRollup.category, ChatDailyRollup.count
+    )
+    if since is not None:
+        rollups = rollups.filter(ChatDailyRollup.day >= since)
+    for day, category, count in rollups:
+        counts[(str(day), category)] += count
+
+    # Anything after the last rolled-up day still comes from the raw table
+    live_since = since
+    rolled_until = db.query(func.max(ChatDailyRollup.day)).scalar()
+    if rolled_until is not None and (since is None or rolled_until >= since):
+        live_since = rolled_until + timedelta(days=1)
+    day = func.date(ChatbotLog.timestamp)
+    live = db.query(day, ChatbotLog.category, func.count(ChatbotLog.id))
+    if live_since is not None:
+        live = live.filter(ChatbotLog.timestamp >= _start_of(live_since))
+    for log_day, category, count in live.group_by(day, ChatbotLog.category):
+        counts[(str(_as_date(log_day)), category or "general")] += count
+    return counts
+
+
+def archive_logs(
+    db,
+    retention_days: int = RETENTION_DAYS,
+    archive_dir: str = ARCHIVE_DIR,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    dry_run: bool = False,
+) -> dict:
+    """Move chat logs older than the retention window into monthly archives"""
+    today = utc_today()
+    refresh_rollups(db, today)
+    rolled_until = db.query(func.max(ChatDailyRollup.day)).scalar()
+    if rolled_until is None:
+        return {"archived": 0, "files": []}
+
+    # Days inside the refresh window get recounted from raw rows, so keep them
+    keep_days = max(retention_days, ROLLUP_REFRESH_DAYS)
+    cutoff = _start_of(
+        min(today - timedelta(days=keep_days), rolled_until + timedelta(days=1))
+    )
+    cold = db.query(ChatbotLog).filter(ChatbotLog.timestamp < cutoff)
+    if dry_run:
+        return {"archived": cold.count(), "files": [], "cutoff": str(cutoff)}
+
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = 0
+    files = set()
+    while True:
+        logs = (
+            db.query(
+                ChatbotLog.id,
+                ChatbotLog.user_id,
+                ChatbotLog.message,
+                ChatbotLog.response,
+                ChatbotLog.category,
+                ChatbotLog.timestamp,
+            )
+            .filter(ChatbotLog.timestamp < cutoff)
+            .order_by(ChatbotLog.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not logs:
+            break
+
+        by_month = defaultdict(list)
+        for log in logs:
+            by_month[log.timestamp.strftime("%Y-%m")].append(log)
+        for month, rows in by_month.items():
+            path = os.path.join(archive_dir, f"chatbot_logs-{month}.jsonl.gz")
+            # Appending adds a gzip member; readers see one continuous stream
+            with gzip.open(path, "at", encoding="utf-8") as archive:
+                for log in rows:
+                    record = {
+                        "id": log.id,
+                        "user_id": log.user_id,
+                        "message": log.message,
+                        "response": log.response,
+                        "category": log.category,
+                        "timestamp": log.timestamp.isoformat(),
+                    }
+                    archive.write(json.dumps(record, ensure_ascii=False) + "\n")
+            files.add(path)
+
+        # Files are closed before the rows go, so a crash can only duplicate
+        # lines (deduplicate by id), never lose them
+        db.query(ChatbotLog).filter(ChatbotLog.id.in_([log.id for log in logs])).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        archived += len(logs)
+
+    return {"archived": archived, "files": sorted(files), "cutoff": str(cutoff)}
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--retention-days", type=int, default=RETENTION_DAYS)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = archive_logs(
+            db,
+            retention_days=args.retention_days,
+            archive_dir=args.archive_dir,
+            dry_run=args.dry_run,
+        )
+    finally:
+        db.close()
+    print(f"Archived {result['archived']} chat logs before {result.get('cutoff')}")
+    for path in result["files"]:
+        print(f"  - {path}")
@@ -0,0 +1,123 @@
+"""
+Keyword lexicon used to categorise chat messages and detect escalations.
+
+The lexicon lives in a JSON file (``CHAT_LEXICON_PATH``, default
+``chat_lexicon.json``) and is compiled into a single ``KeywordMatcher``.
+The file is re-checked periodically, so edits take effect without a
+restart; a file that fails to load leaves the previous lexicon in place.
+``BUILTIN_ESCALATION`` is always merged in, so a missing or broken file, or
+one without an ``escalation`` section, can't switch crisis escalation off.
+"""
+
+import json
+import os
+import threading
+import time
+
+from firebase_config import safe_print
+from text_matcher import KeywordMatcher
+
+LEXICON_PATH = os.getenv(
+    "CHAT_LEXICON_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_lexicon.json"),
+)
+RELOAD_INTERVAL = float(os.getenv("CHAT_LEXICON_RELOAD_SECONDS", "5"))
+
+DEFAULT_CATEGORY = "general"
+ESCALATION = "__escalation__"
+
+# Escalation floor that holds whatever the lexicon file says
+BUILTIN_ESCALATION = (
+    "suicide",
+    "kill myself",
+    "end it all",
+    "not worth living",
+    "severe depression",
+    "can't cope",
+    "emergency",
+    "crisis",
+    "आत्महत्या",
+    "aatmahatya",
+)
+
+
+class ChatLexicon:
+    """Compiled lexicon: category scores and escalation in one scan"""
+
+    def __init__(self, data: dict):
+        self.version = data.get("version")
+        self.categories = list(data["categories"])
+        patterns = []
+        for category, spec in data["categories"].items():
+            weight = spec.get("weight", 1.0)
+            for keywords in spec["keywords"].values():
+                patterns.extend((k.casefold(), category, weight) for k in keywords)
+        escalation = set(BUILTIN_ESCALATION)
+        for keywords in data.get("escalation", {}).values():
+            escalation.update(keywords)
+        patterns.extend((k.casefold(), ESCALATION, 1) for k in sorted(escalation))
+        self.matcher = KeywordMatcher(patterns)
+
+    def classify(self, normalized_message: str):
+        """Return (category, category_scores, escalate) for a casefolded message"""
+        scores = self.matcher.scan(normalized_message)
+        escalate = scores.pop(ESCALATION, 0) > 0
+        category, best = DEFAULT_CATEGORY, 0
+        # Ties go to the category listed first in the lexicon
+        for name in self.categories:
+            if scores.get(name, 0) > best:
+                category, best = name, scores[name]
+        return category, scores, escalate
+
+
+_lock = threading.Lock()
+_lexicon = None
+_loaded_mtime = None
+_last_check = 0.0
+
+
+def _load():
+    global _lexicon, _loaded_mtime
+    try:
+        mtime = os.path.getmtime(LEXICON_PATH)
+        if _lexicon is not None and mtime == _loaded_mtime:
+            return
+        # Don't retry a broken file until it changes again
+        _loaded_mtime = mtime
+        with open(LEXICON_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        _lexicon = ChatLexicon(data)
+        if not any(data.get("escalation", {}).values()):
+            safe_print(
+                f"ERROR: chat lexicon {LEXICON_PATH} has no escalation terms; "
+                "only the built-in ones apply"
+            )
+    except (OSError, ValueError, KeyError, AttributeError, TypeError) as e:
+        if _lexicon is None:
+            safe_print(
+                f"ERROR: failed to load chat lexicon from {LEXICON_PATH}: {e!r}; "
+                "categories are off and only built-in escalation terms apply"
+            )
+            _lexicon = ChatLexicon({"categories": {}})
+        else:
+            safe_print(
+                f"ERROR: failed to reload chat lexicon from {LEXICON_PATH}: {e!r}; "
+                "keeping the previous one"
+            )
+
+
+def get_lexicon() -> ChatLexicon:
+    """Return the current lexicon, reloading it if the file has changed"""
+    global _last_check
+    now = time.monotonic()
+    if _lexicon is None or now - _last_check >= RELOAD_INTERVAL:
+        with _lock:
+            if _lexicon is None or now - _last_check >= RELOAD_INTERVAL:
+                _load()
+                _last_check = now
+    return _lexicon
+
+
+def classify_message(message: str):
+    """Return (category, category_scores, escalate) for a raw message"""
+    return get_lexicon().classify(message.casefold())
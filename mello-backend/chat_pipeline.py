@@ -0,0 +1,41 @@
+"""
+Single pre-processing pass for incoming chat messages.
+
+``prepare_message`` casefolds, classifies, normalises and measures a message
+once. Categorisation, escalation, the reply cache key, the fallback reply
+and prompt packing all read from the result instead of redoing that work.
+"""
+
+from chat_lexicon import get_lexicon
+from conversation import estimate_tokens
+from fallback_responder import detect_language
+from response_cache import normalize_folded
+
+
+class PreparedMessage:
+    """A chat message with everything later stages need, computed once"""
+
+    __slots__ = (
+        "text",
+        "folded",
+        "normalized",
+        "language",
+        "tokens",
+        "category",
+        "category_scores",
+        "escalate",
+    )
+
+    def __init__(self, text: str):
+        self.text = text
+        self.folded = text.casefold()
+        self.category, self.category_scores, self.escalate = get_lexicon().classify(
+            self.folded
+        )
+        self.normalized = normalize_folded(self.folded)
+        self.language = detect_language(text)
+        self.tokens = estimate_tokens(text)
+
+
+def prepare_message(text: str) -> PreparedMessage:
+    return PreparedMessage(text)
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import deque
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a rolling window of recent calls.
+
+    The circuit opens when, over the last ``window`` calls (and at least
+    ``min_calls``), the share of failures reaches ``failure_rate`` or the share
+    of calls slower than ``slow_call_seconds`` reaches ``slow_call_rate``.
+    After ``cooldown`` seconds one trial call is let through; its outcome
+    closes the circuit again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_rate: float = 0.5,
+        cooldown: float = 30.0,
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record(self, failed: bool, elapsed: float):
+        """Record the outcome of a call that allow() let through"""
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = False
+                if failed or slow:
+                    self._open()
+                else:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for failed, _ in self._outcomes if failed)
+            slow_calls = sum(1 for _, slow in self._outcomes if slow)
+            if (
+                failures / calls >= self.failure_rate
+                or slow_calls / calls >= self.slow_call_rate
+            ):
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
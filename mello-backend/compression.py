@@ -0,0 +1,129 @@
+"""
+Response compression middleware.
+
+Complete response bodies of at least ``minimum_size`` bytes with a textual
+content type are compressed with brotli when the client accepts it and the
+optional ``brotli`` package is installed, otherwise with gzip. Streaming
+responses such as server-sent events pass through untouched so they keep
+flushing event by event.
+"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _accepted_encodings(header: str):
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    def __init__(
+        self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality=4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoding(self, scope):
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accepted = _accepted_encodings(value.decode("latin-1"))
+                if brotli is not None and "br" in accepted:
+                    return "br"
+                if "gzip" in accepted or "*" in accepted:
+                    return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send):
+        encoding = self._choose_encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks = []
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                # Streaming response: send as-is from here on
+                passthrough = True
+                await send(start)
+                await send({**message, "body": b"".join(chunks)})
+                return
+
+            body = b"".join(chunks)
+            headers = [(k.lower(), v) for k, v in start["headers"]]
+            header_names = {k for k, _ in headers}
+            content_type = dict(headers).get(b"content-type", b"").decode("latin-1")
+            if (
+                len(body) < self.minimum_size
+                or b"content-encoding" in header_names
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send({**message, "body": body})
+                return
+
+            body = self._compress(body, encoding)
+            rewritten = []
+            for name, value in headers:
+                if name == b"content-length":
+                    continue
+                if name == b"etag" and not value.startswith(b"W/"):
+                    # Compressed bytes differ, so the validator becomes weak
+                    value = b"W/" + value
+                if name == b"vary":
+                    continue
+                rewritten.append((name, value))
+            vary = dict(headers).get(b"vary")
+            rewritten += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": rewritten})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,155 @@
+"""
+Short-term conversation memory for the chatbot.
+
+Recent turns are kept per conversation in a bounded in-memory store. When a
+conversation without a session id isn't in memory (after a restart, or on
+another worker) it is rebuilt from the latest ``ChatbotLog`` rows; named
+sessions start empty. ``pack_prompt`` fits as many
+recent turns as the token budget allows and folds older ones into a short
+summary line so prompt size stays bounded.
+"""
+
+import math
+import os
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from cache import TTLCache
+from models import ChatbotLog
+
+MAX_TURNS = int(os.getenv("CHAT_MEMORY_TURNS", "10"))
+PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", "1500"))
+# Turns older than this are treated as a new conversation
+SESSION_IDLE = timedelta(minutes=int(os.getenv("CHAT_SESSION_IDLE_MINUTES", "30")))
+SUMMARY_WORDS = 12
+# "\n\nStudent: " and "\n\nMello:" around the new message
+TAIL_TOKENS = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate model tokens: ~4 chars per token for ASCII, ~2 otherwise"""
+    if text.isascii():
+        return math.ceil(len(text) / 4)
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 2)
+
+
+@lru_cache(maxsize=8)
+def _static_tokens(text: str) -> int:
+    # System prompts are fixed strings; count them once
+    return estimate_tokens(text)
+
+
+@lru_cache(maxsize=4096)
+def _format_turn(student: str, reply: str):
+    # Turns are re-sent on every message of a conversation; str hashes are
+    # cached, so repeat lookups don't rescan the text
+    turn = f"\n\nStudent: {student}\nMello: {reply}"
+    return turn, estimate_tokens(turn)
+
+
+class ConversationStore:
+    """Bounded per-conversation history of (message, response) turns"""
+
+    def __init__(self, max_conversations=5000, max_turns=MAX_TURNS):
+        self.max_turns = max_turns
+        self._cache = TTLCache(
+            maxsize=max_conversations, ttl=SESSION_IDLE.total_seconds()
+        )
+
+    @property
+    def cache(self) -> TTLCache:
+        """The backing cache, for hit-rate metrics"""
+        return self._cache
+
+    def history(self, key, db=None, user_id=None, session_id=None):
+        """Return recent turns, oldest first, loading from ChatbotLog on a miss"""
+        # Logs don't record their session, so rebuilding a named session
+        # from them would pull in turns from the student's other sessions
+        turns = self._cache.get(key)
+        if turns is None:
+            turns = deque(maxlen=self.max_turns)
+            if db is not None and user_id is not None and session_id is None:
+                since = datetime.now(timezone.utc) - SESSION_IDLE
+                logs = (
+                    db.query(ChatbotLog.message, ChatbotLog.response)
+                    .filter(
+                        ChatbotLog.user_id == user_id, ChatbotLog.timestamp >= since
+                    )
+                    .order_by(ChatbotLog.timestamp.desc())
+                    .limit(self.max_turns)
+                    .all()
+                )
+                turns.extend(reversed([(log.message, log.response) for log in logs]))
+            self._cache.set(key, turns)
+        return list(turns)
+
+    def append(self, key, message: str, response: str):
+        turns = self._cache.get(key)
+        if turns is None:
+            turns = deque(maxlen=self.max_turns)
+        turns.append((message, response))
+        # Re-set to refresh the idle timeout
+        self._cache.set(key, turns)
+
+
+def _summarise(turns, allowance: int) -> str:
+    """One-line summary of older student messages, newest first, within allowance"""
+    summary = "Earlier the student mentioned: "
+    snippets = []
+    used = estimate_tokens(summary)
+    for message, _ in reversed(turns):
+        words = message.split()
+        snippet = " ".join(words[:SUMMARY_WORDS])
+        snippet += "..." if len(words) > SUMMARY_WORDS else ""
+        cost = estimate_tokens(snippet) + 1
+        if used + cost > allowance:
+            break
+        snippets.append(snippet)
+        used += cost
+    if not snippets:
+        return ""
+    return summary + "; ".join(reversed(snippets))
+
+
+def _fit_turns(turns, allowance: int):
+    """Newest turns that fit in the allowance, oldest first, and their cost"""
+    kept = []
+    used = 0
+    for student, reply in reversed(turns):
+        turn, cost = _format_turn(student, reply)
+        if used + cost > allowance:
+            break
+        kept.append(turn)
+        used += cost
+    kept.reverse()
+    return kept, used
+
+
+def pack_prompt(
+    system_prompt: str, turns, message: str, budget=None, message_tokens=None
+):
+    """Build the prompt within the token budget; returns (prompt, token_count)"""
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    if message_tokens is None:
+        message_tokens = estimate_tokens(message)
+    tail = f"\n\nStudent: {message}\n\nMello:"
+    fixed = _static_tokens(system_prompt) + message_tokens + TAIL_TOKENS
+    available = budget - fixed
+
+    kept, used = _fit_turns(turns, available)
+    summary = ""
+    if len(kept) < len(turns):
+        # Not everything fits: keep a fifth of the room for summarising the rest
+        reserve = max(available // 5, 0)
+        kept, used = _fit_turns(turns, available - reserve)
+        summary = _summarise(turns[: len(turns) - len(kept)], available - used)
+        if summary:
+            summary = f"\n\n{summary}"
+            used += estimate_tokens(summary)
+
+    return system_prompt + summary + "".join(kept) + tail, fixed + used
+
+
+conversation_store = ConversationStore()
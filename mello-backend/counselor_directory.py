@@ -0,0 +1,203 @@
+"""
+In-memory directory of approved counselors.
+
+Booking and counselor pages list the same approved counselors, whose
+profiles change only when an admin approves or suspends one or a counselor
+edits their profile. Each worker keeps those profiles in memory with facet
+indexes for specializations and languages, so filtering needs no queries.
+Ratings and booked slots change with every feedback and booking, so they
+stay out of the snapshot: a listing reads them for the matching counselors
+in two small indexed queries. Its stamp is ``COUNSELOR_DIRECTORY_STAMP``
+(default in the temp directory).
+"""
+
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+
+from counselor_ratings import rating_summary
+from generation_stamp import StampedSnapshot, facet_filter
+from models import Booking, CounselorRating, CounselorStatus, User, UserRole
+from sqlalchemy.orm import Session
+
+STAMP_PATH = os.getenv(
+    "COUNSELOR_DIRECTORY_STAMP",
+    os.path.join(tempfile.gettempdir(), "mello-counselor-directory.stamp"),
+)
+
+# Bookable hours: the next SLOT_DAYS days, on the hour from 9 AM to 5 PM
+SLOT_DAYS = 7
+SLOT_HOURS = range(9, 17)
+ACTIVE_BOOKING_STATUSES = ("pending", "confirmed")
+
+SORTS = ("name", "rating", "next_available")
+
+_SPECIALIZATION_SEPARATOR = re.compile(r"\s*(?:[,;/&]|\band\b)\s*")
+
+
+def split_specializations(specialization) -> list:
+    """Individual specializations from a free-text field like 'Anxiety, Stress'"""
+    if not specialization:
+        return []
+    parts = _SPECIALIZATION_SEPARATOR.split(specialization)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _slots(booked, now):
+    for day in range(SLOT_DAYS):
+        date = now.date() + timedelta(days=day)
+        for hour in SLOT_HOURS:
+            slot_time = datetime.combine(date, datetime.min.time().replace(hour=hour))
+            if slot_time > now and slot_time not in booked:
+                yield slot_time
+
+
+def open_slots(booked, now=None) -> list:
+    """Bookable slots from now on that aren't taken, earliest first"""
+    return list(_slots(booked, now or datetime.now()))
+
+
+def booked_slots(db: Session, counselor_ids, now=None) -> dict:
+    """Taken slots in the bookable window for each of the counselors"""
+    now = now or datetime.now()
+    booked = {counselor_id: set() for counselor_id in counselor_ids}
+    if not booked:
+        return booked
+    rows = db.query(Booking.counselor_id, Booking.preferred_datetime).filter(
+        Booking.counselor_id.in_(booked),
+        Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+        Booking.preferred_datetime >= now,
+        Booking.preferred_datetime < now + timedelta(days=SLOT_DAYS + 1),
+    )
+    for counselor_id, slot_time in rows:
+        booked[counselor_id].add(slot_time)
+    return booked
+
+
+def ratings(db: Session, counselor_ids) -> dict:
+    """Rating fields for each of the counselors"""
+    counselor_ids = list(counselor_ids)
+    rows = {}
+    if counselor_ids:
+        rows = {
+            row.counselor_id: row
+            for row in db.query(CounselorRating).filter(
+                CounselorRating.counselor_id.in_(counselor_ids)
+            )
+        }
+    return {
+        counselor_id: rating_summary(rows.get(counselor_id))
+        for counselor_id in counselor_ids
+    }
+
+
+class CounselorDirectory:
+    """Snapshot of approved counselor profiles with facet indexes"""
+
+    def __init__(self, counselors, generation: str):
+        self.generation = generation
+        self.items = []
+        self.facets = {"specialization": {}, "language": {}}
+        self.facet_labels = {"specialization": {}, "language": {}}
+        for position, counselor in enumerate(counselors):
+            specializations = split_specializations(counselor.specialization)
+            language = counselor.preferred_language or "en"
+            self.items.append(
+                {
+                    "id": counselor.id,
+                    "name": counselor.name,
+                    "email": counselor.email,
+                    "phone_number": counselor.phone_number,
+                    "specialization": counselor.specialization,
+                    "specializations": specializations,
+                    "language": language,
+                }
+            )
+            for facet, values in (
+                ("specialization", specializations),
+                ("language", [language]),
+            ):
+                for value in values:
+                    key = value.casefold()
+                    self.facets[facet].setdefault(key, []).append(position)
+                    self.facet_labels[facet].setdefault(key, value)
+        self.by_id = {item["id"]: item for item in self.items}
+
+    def facet_counts(self) -> dict:
+        """Counselors per specialization and per language"""
+        return {
+            facet: {
+                self.facet_labels[facet][key]: len(positions)
+                for key, positions in sorted(index.items())
+            }
+            for facet, index in self.facets.items()
+        }
+
+    def filter(self, **criteria) -> list:
+        """Counselors matching every given facet value (case-insensitive)"""
+        return facet_filter(self.items, self.facets, criteria, str.casefold)
+
+    def open_slots(self, db: Session, counselor_id: int, now=None) -> list:
+        now = now or datetime.now()
+        return open_slots(booked_slots(db, [counselor_id], now)[counselor_id], now)
+
+    def listing(
+        self, db: Session, specialization=None, language=None, sort="name", now=None
+    ):
+        """Filtered counselors with ratings and next open slot, in the requested order"""
+        now = now or datetime.now()
+        matches = self.filter(specialization=specialization, language=language)
+        ids = [item["id"] for item in matches]
+        booked = booked_slots(db, ids, now)
+        summaries = ratings(db, ids)
+        items = [
+            {
+                **item,
+                **summaries[item["id"]],
+                "next_available_slot": next(_slots(booked[item["id"]], now), None),
+            }
+            for item in matches
+        ]
+        if sort == "rating":
+            items.sort(
+                key=lambda item: (
+                    item["average_rating"] is None,
+                    -(item["average_rating"] or 0),
+                    -item["rating_count"],
+                )
+            )
+        elif sort == "next_available":
+            items.sort(
+                key=lambda item: (
+                    item["next_available_slot"] is None,
+                    item["next_available_slot"] or now,
+                )
+            )
+        return items
+
+
+def _load(db, generation: str) -> CounselorDirectory:
+    counselors = (
+        db.query(User)
+        .filter(
+            User.role == UserRole.COUNSELOR,
+            User.counselor_status == CounselorStatus.APPROVED,
+        )
+        .order_by(User.name, User.id)
+        .all()
+    )
+    return CounselorDirectory(counselors, generation)
+
+
+_directory = StampedSnapshot(STAMP_PATH, _load)
+
+
+def get_directory() -> CounselorDirectory:
+    """Current directory, rebuilt from the database if another writer moved on"""
+    return _directory.get()
+
+
+def invalidate_counselor_directory():
+    """Make every worker rebuild its directory; call after a profile or approval change"""
+    _directory.invalidate()
@@ -0,0 +1,125 @@
+"""
+Per-counselor rating aggregates kept alongside feedback.
+
+``counselor_ratings`` holds one row per rated counselor: the rating count
+and sum, a 1-5 star histogram and the would-recommend tally. Feedback
+writers call ``record_rating`` in the same transaction as the feedback
+row, so listings can show ratings by joining one row per counselor
+instead of aggregating the feedback table.
+
+``python counselor_ratings.py`` rebuilds every row from feedback, for
+existing data or after fixing feedback by hand.
+"""
+
+from models import CounselorRating, Feedback
+from sqlalchemy import case, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+STARS = range(1, 6)
+
+
+def record_rating(db, feedback: Feedback):
+    """Add new feedback to its counselor's aggregate within the caller's transaction"""
+    # Flush first so column defaults (would_recommend) are what gets counted
+    db.flush()
+    rating = feedback.rating
+    would_recommend = feedback.would_recommend
+    added = {
+        "rating_count": 1,
+        "rating_sum": rating,
+        **{f"stars_{stars}": int(stars == rating) for stars in STARS},
+        "recommend_count": int(bool(would_recommend)),
+        "recommend_answers": int(would_recommend is not None),
+    }
+    increments = {
+        name: getattr(CounselorRating, name) + amount
+        for name, amount in added.items()
+        if amount
+    }
+
+    # One atomic upsert, so two first ratings for a counselor can't both
+    # try to insert the row
+    if db.get_bind().dialect.name == "mysql":
+        statement = (
+            mysql_insert(CounselorRating)
+            .values(counselor_id=feedback.counselor_id, **added)
+            .on_duplicate_key_update(increments)
+        )
+    else:
+        statement = (
+            sqlite_insert(CounselorRating)
+            .values(counselor_id=feedback.counselor_id, **added)
+            .on_conflict_do_update(index_elements=["counselor_id"], set_=increments)
+        )
+    db.execute(statement)
+
+
+def rating_summary(rating_row) -> dict:
+    """Public rating fields for a counselor; zeros when nobody has rated them"""
+    if rating_row is None or not rating_row.rating_count:
+        return {
+            "average_rating": None,
+            "rating_count": 0,
+            "rating_histogram": {str(stars): 0 for stars in STARS},
+            "would_recommend_ratio": None,
+        }
+    return {
+        "average_rating": round(rating_row.rating_sum / rating_row.rating_count, 2),
+        "rating_count": rating_row.rating_count,
+        "rating_histogram": {
+            str(stars): getattr(rating_row, f"stars_{stars}") for stars in STARS
+        },
+        "would_recommend_ratio": round(
+            rating_row.recommend_count / rating_row.recommend_answers, 2
+        )
+        if rating_row.recommend_answers
+        else None,
+    }
+
+
+def rebuild_counselor_ratings(db) -> int:
+    """Recompute every counselor's aggregate from the feedback table"""
+    rated = Feedback.rating.between(1, 5)
+    rows = (
+        db.query(
+            Feedback.counselor_id,
+            func.count(Feedback.id),
+            func.sum(Feedback.rating),
+            *(
+                func.sum(case((Feedback.rating == stars, 1), else_=0))
+                for stars in STARS
+            ),
+            func.sum(case((Feedback.would_recommend.is_(True), 1), else_=0)),
+            func.count(Feedback.would_recommend),
+        )
+        .filter(Feedback.counselor_id.isnot(None), rated)
+        .group_by(Feedback.counselor_id)
+        .all()
+    )
+
+    db.query(CounselorRating).delete(synchronize_session=False)
+    for counselor_id, count, total, *stars, recommended, answered in rows:
+        db.add(
+            CounselorRating(
+                counselor_id=counselor_id,
+                rating_count=count,
+                rating_sum=int(total),
+                **{f"stars_{n}": int(value) for n, value in zip(STARS, stars)},
+                recommend_count=int(recommended),
+                recommend_answers=answered,
+            )
+        )
+    db.commit()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = rebuild_counselor_ratings(db)
+    finally:
+        db.close()
+    print(f"Rebuilt rating aggregates for {count} counselors")
@@ -0,0 +1,196 @@
+"""
+In-process publish/subscribe for real-time staff notifications.
+
+Request handlers await ``publish_event(type, channels, data)``; open
+notification streams subscribe to the channels their user may see:
+
+- ``admins``: every admin
+- ``counselors``: every counselor
+- ``counselor:<id>``: one counselor
+
+``NOTIFY_BROKER`` picks how events reach other uvicorn workers:
+
+- ``memory`` (default): this process only, for single-worker deployments
+  and tests
+- ``redis``: events go through Redis pub/sub (``NOTIFY_REDIS_URL``) so every
+  worker's subscribers receive them; needs the ``redis`` package
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.concurrency import run_in_threadpool
+from firebase_config import safe_print
+
+SUBSCRIBER_QUEUE_SIZE = 100
+REDIS_CHANNEL = "mello:notifications"
+REDIS_RETRY_MIN_DELAY = 1.0
+REDIS_RETRY_MAX_DELAY = 30.0
+
+
+class Subscription:
+    """Queue of events for one listener, fed from any thread"""
+
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = 0
+
+    def deliver(self, event: dict):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The stream's event loop has already shut down
+            self.close()
+
+    def _put(self, event: dict):
+        # A slow client loses its oldest events rather than holding memory
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float):
+        """Next event, or None if nothing arrives within the timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """Delivers events to subscribers in this process"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # channel -> set of Subscription
+
+    def subscribe(self, channels) -> Subscription:
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def publish(self, channels, event: dict):
+        self.deliver(channels, event)
+
+    def deliver(self, channels, event: dict):
+        with self._lock:
+            # A listener on several of the channels still gets the event once
+            targets = set()
+            for channel in channels:
+                targets.update(self._subscribers.get(channel, ()))
+        for subscription in targets:
+            subscription.deliver(event)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(set().union(*self._subscribers.values()))
+
+
+class RedisBroker(InMemoryBroker):
+    """Fans events out to every worker through Redis pub/sub"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis
+
+        super().__init__()
+        self._redis = redis.Redis.from_url(url)
+        self._connection_errors = (redis.ConnectionError, redis.TimeoutError)
+        self._listener = threading.Thread(
+            target=self._listen, name="notify-listener", daemon=True
+        )
+        self._listener.start()
+
+    def publish(self, channels, event: dict):
+        # Every worker, this one included, delivers it from its listener
+        payload = json.dumps({"channels": list(channels), "event": event})
+        self._redis.publish(REDIS_CHANNEL, payload)
+
+    def _listen(self):
+        # Events published while the connection is down are lost; streams
+        # pick up again with the next one once we've re-subscribed
+        delay = REDIS_RETRY_MIN_DELAY
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(REDIS_CHANNEL)
+                delay = REDIS_RETRY_MIN_DELAY
+                for message in pubsub.listen():
+                    self._handle(message)
+            except self._connection_errors as e:
+                safe_print(
+                    f"ERROR: Lost Redis notification subscription, "
+                    f"retrying in {delay:.0f}s: {e!r}"
+                )
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            time.sleep(delay)
+            delay = min(delay * 2, REDIS_RETRY_MAX_DELAY)
+
+    def _handle(self, message):
+        try:
+            payload = json.loads(message["data"])
+            self.deliver(payload["channels"], payload["event"])
+        except Exception as e:
+            safe_print(f"Bad notification message: {e!r}")
+
+
+def get_broker():
+    """Build the broker selected by the environment"""
+    name = os.getenv("NOTIFY_BROKER", "memory")
+    if name == "memory":
+        return InMemoryBroker()
+    if name == "redis":
+        return RedisBroker(os.getenv("NOTIFY_REDIS_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown NOTIFY_BROKER: {name}")
+
+
+broker = get_broker()
+
+
+async def publish_event(event_type: str, channels, data: dict):
+    """Send a notification to everyone subscribed to any of the channels
+
+    Failures are logged, never raised: a notification must not break the
+    request that triggered it. Publishing runs in the threadpool, since the
+    Redis broker makes a blocking network call.
+    """
+    event = {
+        "id": uuid.uuid4().hex,
+        "type": event_type,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "data": data,
+    }
+    try:
+        await run_in_threadpool(broker.publish, channels, event)
+    except Exception as e:
+        safe_print(f"Failed to publish {event_type} notification: {e!r}")
+    return event
@@ -0,0 +1,66 @@
+"""
+Curated replies used when the language model is unavailable.
+
+Answers are short, safe and category-specific so the chat stays useful
+while the model is slow or down. Messages written in Devanagari get the
+Hindi set.
+"""
+
+import zlib
+
+FALLBACK_RESPONSES = {
+    "en": {
+        "stress": [
+            "It sounds like a lot is on your plate right now. Try breaking your work into small steps and take a short break to breathe slowly for a minute between them.",
+            "Stress can feel overwhelming, but you don't have to handle it all at once. Pick one task to focus on, and remember to rest, eat and move a little today.",
+        ],
+        "sleep": [
+            "Sleep troubles are really common during busy periods. Try keeping a regular bedtime, putting screens away 30 minutes before sleep, and avoiding caffeine late in the day.",
+            "If your mind is racing at night, jotting your thoughts down before bed can help. A slow breathing exercise, in for 4 counts and out for 6, may also help you settle.",
+        ],
+        "anxiety": [
+            "Feeling anxious is tough, and you're not alone in it. Try grounding yourself: name five things you can see, four you can hear and three you can touch.",
+            "Worry before exams is very normal. Plan short study sessions with breaks, and remind yourself of what you have already prepared.",
+        ],
+        "depression": [
+            "I'm sorry you're feeling this way. Reaching out to someone you trust, or to one of our counselors, can really help, and small steps like a short walk can make a difference.",
+            "Feeling low can make everything harder. Be gentle with yourself today, and consider booking a session with a counselor to talk it through.",
+        ],
+        "general": [
+            "Thanks for sharing. I'm here to support you. Taking a few slow breaths and a short break can help, and our counselors are available if you'd like to talk to someone.",
+            "I'm having trouble answering in detail right now, but I'm still here for you. You can explore our wellness resources or book a session with a counselor anytime.",
+        ],
+    },
+    "hi": {
+        "stress": [
+            "लगता है अभी आप पर बहुत कुछ है। अपने काम को छोटे हिस्सों में बाँटें और बीच-बीच में एक मिनट धीरे-धीरे साँस लेने का विराम लें।",
+        ],
+        "sleep": [
+            "व्यस्त समय में नींद की परेशानी आम है। सोने का नियमित समय रखें, सोने से 30 मिनट पहले स्क्रीन दूर रखें और शाम को कैफ़ीन से बचें।",
+        ],
+        "anxiety": [
+            "चिंता महसूस करना कठिन होता है, और आप इसमें अकेले नहीं हैं। पाँच चीज़ें जो आप देख सकते हैं, चार जो सुन सकते हैं और तीन जिन्हें छू सकते हैं, उनके नाम लें।",
+        ],
+        "depression": [
+            "मुझे दुख है कि आप ऐसा महसूस कर रहे हैं। किसी भरोसेमंद व्यक्ति से या हमारे काउंसलर से बात करना सच में मदद कर सकता है।",
+        ],
+        "general": [
+            "साझा करने के लिए धन्यवाद। मैं आपकी मदद के लिए यहाँ हूँ। कुछ गहरी साँसें लें, और अगर आप बात करना चाहें तो हमारे काउंसलर उपलब्ध हैं।",
+        ],
+    },
+}
+
+
+def detect_language(message: str) -> str:
+    """Return hi for messages containing Devanagari, otherwise en"""
+    if any("ऀ" <= char <= "ॿ" for char in message):
+        return "hi"
+    return "en"
+
+
+def fallback_response(message: str, category: str, language=None) -> str:
+    """Pick a curated reply for the message's category and script"""
+    responses = FALLBACK_RESPONSES[language or detect_language(message)]
+    options = responses.get(category) or responses["general"]
+    # Stable choice per message so retries don't flip between answers
+    return options[zlib.crc32(message.encode()) % len(options)]
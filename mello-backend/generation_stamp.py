@@ -0,0 +1,108 @@
+"""
+Cross-worker cache generations backed by a small stamp file.
+
+Writers call ``advance()`` after committing, which writes a new generation.
+Readers call ``current()`` on every request (one ``stat``) and rebuild their
+in-memory copy when it has moved. Workers on different hosts need the stamp
+on a shared volume.
+
+``StampedSnapshot`` wraps that loop for data kept whole in memory, and
+``facet_filter`` answers lookups against the per-facet position indexes
+such snapshots build.
+"""
+
+import os
+import threading
+import time
+
+from database import SessionLocal
+
+
+def _new_generation() -> str:
+    return f"{time.time_ns():x}-{os.getpid():x}"
+
+
+class GenerationStamp:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._generation = None
+
+    def _write(self, generation: str):
+        # Write-then-rename so readers never see a half-written stamp
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as stamp:
+            stamp.write(generation)
+        os.replace(temp_path, self.path)
+
+    def current(self) -> str:
+        """The latest generation any worker has written"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._write(_new_generation())
+            stat = os.stat(self.path)
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            with self._lock:
+                with open(self.path) as stamp:
+                    self._generation = stamp.read().strip()
+                self._signature = signature
+        return self._generation
+
+    def advance(self):
+        """Start a new generation; call after committing a change"""
+        self._write(_new_generation())
+
+
+class StampedSnapshot:
+    """In-memory snapshot that is reloaded when its stamp has moved
+
+    ``load(db, generation)`` builds the snapshot, which must keep the
+    generation it was given as its ``generation`` attribute.
+    """
+
+    def __init__(self, path: str, load):
+        self.stamp = GenerationStamp(path)
+        self._load = load
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def get(self):
+        generation = self.stamp.current()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.generation == generation:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot.generation != generation:
+                db = SessionLocal()
+                try:
+                    self._snapshot = self._load(db, generation)
+                finally:
+                    db.close()
+            return self._snapshot
+
+    def invalidate(self):
+        """Make every worker reload; call after committing a change"""
+        self.stamp.advance()
+
+
+def facet_filter(items, facets, criteria, normalize=None) -> list:
+    """Items whose position is indexed under every given facet value
+
+    ``facets`` maps facet -> value -> positions in ``items``; empty criteria
+    are ignored and matches keep their order in ``items``.
+    """
+    selected = None
+    for facet, value in criteria.items():
+        if not value:
+            continue
+        if normalize is not None:
+            value = normalize(value)
+        positions = set(facets[facet].get(value, ()))
+        selected = positions if selected is None else selected & positions
+    if selected is None:
+        return items
+    return [items[position] for position in sorted(selected)]
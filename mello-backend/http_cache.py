@@ -0,0 +1,130 @@
+"""
+Conditional GET support.
+
+``ConditionalGetMiddleware`` gives complete GET responses a weak ETag
+hashed from the body and answers a matching ``If-None-Match`` with 304, so
+clients skip the download even though the body was built. Endpoints whose
+content changes rarely do better: they derive the ETag from a version
+counter (``content_etag``) and return ``not_modified`` before querying or
+serialising anything. Writers call ``bump_content_version`` in the same
+transaction as their change.
+"""
+
+import hashlib
+
+from fastapi import Response
+from models import ContentVersion
+
+NEWSLETTERS = "newsletters"
+
+
+def bump_content_version(db, name: str):
+    """Advance a content type's version as part of the caller's transaction"""
+    updated = (
+        db.query(ContentVersion)
+        .filter(ContentVersion.name == name)
+        .update(
+            {ContentVersion.version: ContentVersion.version + 1},
+            synchronize_session=False,
+        )
+    )
+    if not updated:
+        db.add(ContentVersion(name=name, version=1))
+
+
+def content_etag(db, name: str) -> str:
+    version = (
+        db.query(ContentVersion.version).filter(ContentVersion.name == name).scalar()
+    )
+    return f'W/"{name}-{version or 0}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+
+def not_modified(etag: str, cache_control=None) -> Response:
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+
+class ConditionalGetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+
+        start = None
+        chunks = []
+        passthrough = False
+
+        async def send_with_etag(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                if start["status"] != 200 or any(
+                    name.lower() == b"cache-control" and b"no-store" in value
+                    for name, value in start["headers"]
+                ):
+                    passthrough = True
+                    await send(start)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                # Streaming responses aren't buffered or validated
+                passthrough = True
+                await send(start)
+                await send({**message, "body": b"".join(chunks)})
+                return
+
+            body = b"".join(chunks)
+            headers = list(start["headers"])
+            etag = next(
+                (v.decode("latin-1") for k, v in headers if k.lower() == b"etag"),
+                None,
+            )
+            if etag is None:
+                digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+                etag = f'W/"{digest}"'
+                headers.append((b"etag", etag.encode("latin-1")))
+
+            if etag_matches(if_none_match, etag):
+                kept = [
+                    (k, v)
+                    for k, v in headers
+                    if k.lower() in (b"etag", b"cache-control", b"vary")
+                ]
+                await send({**start, "status": 304, "headers": kept})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({**start, "headers": headers})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,117 @@
+"""
+Language model backends for the chatbot.
+
+``LLM_PROVIDER`` selects the backend: ``gemini`` (default) or ``stub``. The
+stub needs no network and returns deterministic replies after a simulated
+latency, so the chat pipeline can be load-tested offline:
+
+- ``STUB_LLM_LATENCY``: ``fixed:S``, ``uniform:LOW,HIGH``, ``normal:MEAN,STD``
+  or ``lognormal:MU,SIGMA`` in seconds (default ``fixed:0``)
+- ``STUB_LLM_ERROR_RATE``: share of calls that raise (default 0)
+- ``STUB_LLM_SEED``: seed for the latency/error sampler (default 0)
+"""
+
+import os
+import random
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+
+
+class LLMProvider(ABC):
+    """Interface for a text generation backend"""
+
+    name = "base"
+
+    @abstractmethod
+    def generate(self, prompt: str) -> str:
+        """Return the model's reply to a prompt; blocking, may raise"""
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, model_name: str = "gemini-1.5-flash", api_key: str = None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt: str) -> str:
+        return self.model.generate_content(prompt).text
+
+
+STUB_REPLIES = [
+    "Thanks for sharing that with me. Try taking a few slow breaths and breaking things into smaller steps.",
+    "That sounds difficult. A short walk and a regular sleep routine can help, and our counselors are here if you need them.",
+    "You're not alone in feeling this way. Writing your thoughts down can make them feel more manageable.",
+    "It's okay to take a break. Small, consistent habits often help more than big changes.",
+]
+
+
+class StubProvider(LLMProvider):
+    """Deterministic offline backend with a configurable latency distribution"""
+
+    name = "stub"
+
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._sample_latency = self._parse_latency(latency)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _parse_latency(self, spec: str):
+        kind, _, args = spec.partition(":")
+        params = [float(value) for value in args.split(",") if value]
+        samplers = {
+            "fixed": lambda rng: params[0],
+            "uniform": lambda rng: rng.uniform(params[0], params[1]),
+            "normal": lambda rng: rng.gauss(params[0], params[1]),
+            "lognormal": lambda rng: rng.lognormvariate(params[0], params[1]),
+        }
+        if kind not in samplers:
+            raise ValueError(f"Unknown stub latency distribution: {spec}")
+        return samplers[kind]
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            delay = max(0.0, self._sample_latency(self._random))
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("Simulated LLM failure")
+        return STUB_REPLIES[zlib.crc32(prompt.encode()) % len(STUB_REPLIES)]
+
+
+def get_provider() -> LLMProvider:
+    """Build the provider selected by the environment"""
+    name = os.getenv("LLM_PROVIDER", "gemini")
+    if name == "stub":
+        return StubProvider(
+            latency=os.getenv("STUB_LLM_LATENCY", "fixed:0"),
+            error_rate=float(os.getenv("STUB_LLM_ERROR_RATE", "0")),
+            seed=int(os.getenv("STUB_LLM_SEED", "0")),
+        )
+    if name == "gemini":
+        return GeminiProvider(
+            model_name=os.getenv("LLM_MODEL", "gemini-1.5-flash"),
+            api_key=os.getenv("GEMINI_API_KEY"),
+        )
+    raise ValueError(f"Unknown LLM_PROVIDER: {name}")
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_provider() -> LLMProvider:
+    """The process-wide provider, built on first use rather than at import"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = get_provider()
+    return _default
@@ -0,0 +1,265 @@
+"""
+Background writer that batches inserts off the request path.
+
+Rows are queued by request handlers and written by a single worker thread
+with one multi-row INSERT per batch, flushed whenever ``batch_size`` rows
+are waiting or ``flush_interval`` seconds have passed since the first one.
+A failed batch is retried with backoff, then written row by row. Rows that
+still fail go to an owner-only dead-letter file (JSON lines) and are logged
+as a ``rows_dropped`` event with their count, user ids and timestamps only,
+never their content. ``python log_writer.py replay`` writes them back.
+``stop()`` drains whatever is still queued, so call it on shutdown.
+"""
+
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from database import SessionLocal
+from firebase_config import safe_print
+from models import ChatbotLog
+from patient_analytics import invalidate_patient_analytics
+from sqlalchemy import DateTime, insert
+
+_STOP = object()
+
+
+class BatchWriter:
+    """Queue rows for a table and insert them in batches from a worker thread"""
+
+    def __init__(
+        self,
+        model,
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+        max_queue: int = 10000,
+        on_written=None,
+        retries: int = 3,
+        retry_backoff: float = 0.1,
+        dead_letter_path: str = None,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Called as on_written(rows) after rows are committed
+        self.on_written = on_written
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.dead_letter_path = dead_letter_path
+        self._last_error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self.rows_written = 0
+        self.batches_flushed = 0
+        self.failed_rows = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def submit(self, row: dict) -> bool:
+        """Queue a row; returns False if the queue is full"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self, timeout: float = 10.0):
+        """Flush everything queued so far and stop the worker"""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "rows_written": self.rows_written,
+            "batches_flushed": self.batches_flushed,
+            "failed_rows": self.failed_rows,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self.total_flush_ms / self.batches_flushed, 2)
+            if self.batches_flushed
+            else 0.0,
+        }
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run,
+                        name=f"{self.model.__tablename__}-writer",
+                        daemon=True,
+                    )
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stopping:
+                # Drain anything queued behind the stop marker
+                leftover = []
+                while not self._queue.empty():
+                    leftover.append(self._queue.get_nowait())
+                if leftover:
+                    self._flush(leftover)
+                return
+
+    def _insert(self, rows) -> bool:
+        db = SessionLocal()
+        try:
+            try:
+                db.execute(insert(self.model), rows)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self._last_error = e
+                return False
+            # The rows are in; a failing hook mustn't get them written twice
+            if self.on_written is not None:
+                try:
+                    self.on_written(rows)
+                except Exception as e:
+                    safe_print(f"{self.model.__tablename__} on_written failed: {e!r}")
+            return True
+        finally:
+            db.close()
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        # Transient failures (deadlocks, dropped connections) get retried
+        # as a batch; after that each row goes in on its own so one bad row
+        # can't take the rest of the batch with it
+        written = False
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            written = self._insert(batch)
+            if written:
+                self.rows_written += len(batch)
+                break
+        if not written:
+            dropped = [row for row in batch if not self._insert([row])]
+            self.rows_written += len(batch) - len(dropped)
+            if dropped:
+                self.failed_rows += len(dropped)
+                self._dead_letter(dropped)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.batches_flushed += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+    def _dead_letter(self, rows):
+        saved = False
+        if self.dead_letter_path:
+            try:
+                fd = os.open(
+                    self.dead_letter_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600
+                )
+                with os.fdopen(fd, "a", encoding="utf-8") as dead_letters:
+                    for row in rows:
+                        dead_letters.write(json.dumps(row, default=_encode) + "\n")
+                saved = True
+            except OSError as e:
+                safe_print(f"Failed to write dead letters: {e!r}")
+        # Chat text is sensitive; the log only says which rows went missing
+        safe_print(
+            json.dumps(
+                {
+                    "event": "rows_dropped",
+                    "table": self.model.__tablename__,
+                    "count": len(rows),
+                    "user_ids": [row.get("user_id") for row in rows],
+                    "timestamps": [row.get("timestamp") for row in rows],
+                    "error": type(self._last_error).__name__,
+                    "dead_letter_path": self.dead_letter_path if saved else None,
+                },
+                default=_encode,
+            )
+        )
+
+    def replay_dead_letters(self) -> tuple:
+        """Insert dead-lettered rows; returns (written, still failing)"""
+        if not self.dead_letter_path or not os.path.exists(self.dead_letter_path):
+            return 0, 0
+        # Take the file over so rows dropped meanwhile start a new one
+        replaying = f"{self.dead_letter_path}.{os.getpid()}.replay"
+        os.replace(self.dead_letter_path, replaying)
+        with open(replaying, encoding="utf-8") as dead_letters:
+            rows = [
+                self._decode(json.loads(line)) for line in dead_letters if line.strip()
+            ]
+        failed = [row for row in rows if not self._insert([row])]
+        if failed:
+            self._dead_letter(failed)
+        os.remove(replaying)
+        self.rows_written += len(rows) - len(failed)
+        return len(rows) - len(failed), len(failed)
+
+    def _decode(self, row: dict) -> dict:
+        for column in self.model.__table__.columns:
+            value = row.get(column.key)
+            if isinstance(value, str) and isinstance(column.type, DateTime):
+                row[column.key] = datetime.fromisoformat(value)
+        return row
+
+
+def _encode(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _chat_logs_written(rows):
+    # Counselors see their patients' chat activity in their analytics
+    invalidate_patient_analytics(patient_ids=[row["user_id"] for row in rows])
+
+
+chat_log_writer = BatchWriter(
+    ChatbotLog,
+    batch_size=int(os.getenv("CHAT_LOG_BATCH_SIZE", "100")),
+    flush_interval=float(os.getenv("CHAT_LOG_FLUSH_MS", "200")) / 1000,
+    on_written=_chat_logs_written,
+    dead_letter_path=os.getenv(
+        "CHAT_LOG_DEAD_LETTER_PATH",
+        os.path.join(tempfile.gettempdir(), "mello-chat-logs.dead.jsonl"),
+    ),
+)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] != ["replay"]:
+        sys.exit("usage: python log_writer.py replay")
+    written, failed = chat_log_writer.replay_dead_letters()
+    print(f"Replayed {written} chat logs, {failed} still failing")
@@ -1,9 +1,26 @@
-from database import engine
+import logging
+import os
+
+import metrics
+from auth import RedactTokenFilter
+from compression import CompressionMiddleware
+from conversation import conversation_store
+from database import SessionLocal, engine
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from event_bus import broker
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from firebase_config import initialize_firebase
+from firebase_config import initialize_firebase, safe_print
+from http_cache import ConditionalGetMiddleware
+from llm_providers import default_provider
+from log_writer import chat_log_writer
+from metrics import MetricsMiddleware, track_caches, track_db_pool
 from models import Base
+from newsletter_feed import feed_cache as newsletter_feed_cache
+from patient_analytics import patient_analytics_cache
+from query_stats import QueryStatsMiddleware, instrument_engine
+from response_cache import chat_response_cache
+from responses import FastJSONResponse
 from routers import (
     admin,
     analytics,
@@ -16,9 +33,12 @@ from routers import (
     forum,
     mood,
     newsletter,
+    notifications,
     resources,
+    search,
     user,
 )
+from search_index import ensure_search_index
 
 # Load environment variables
 load_dotenv()
@@ -38,10 +58,14 @@ except Exception as e:
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Notification streams may authenticate with ?token=<Firebase ID token>
+logging.getLogger("uvicorn.access").addFilter(RedactTokenFilter())
+
 app = FastAPI(
     title="Mello - Digital Psychological Intervention System",
     description="MVP for Smart India Hackathon - Mental Health Support for College Students",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # Configure CORS
@@ -54,6 +78,27 @@ app.add_middleware(
 )
 
 
+# Compression wraps ETag handling so validators are computed on plain bodies
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "1024")),
+)
+# Outermost, so statements from every layer count towards the request
+instrument_engine(engine)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+track_db_pool(engine)
+track_caches(
+    {
+        "chat_response": chat_response_cache,
+        "conversation": conversation_store.cache,
+        "patient_analytics": patient_analytics_cache,
+        "newsletter_feed": newsletter_feed_cache,
+    }
+)
+
 # Include routers
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 app.include_router(booking.router, prefix="/api/booking", tags=["Booking"])
@@ -68,6 +113,10 @@ app.include_router(user.router, prefix="/api/user", tags=["User"])
 app.include_router(mood.router, prefix="/api/mood", tags=["Mood Tracking"])
 app.include_router(newsletter.router, prefix="/api/newsletter", tags=["Newsletter"])
 app.include_router(feedback.router, prefix="/api/feedback", tags=["Feedback"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
+app.include_router(
+    notifications.router, prefix="/api/notifications", tags=["Notifications"]
+)
 
 
 @app.get("/")
@@ -77,7 +126,51 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "mello-backend"}
+    return {
+        "status": "healthy",
+        "service": "mello-backend",
+        "chat_log_queue": chat_log_writer.stats(),
+        "notification_subscribers": broker.subscriber_count(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.on_event("startup")
+def build_search_index():
+    db = SessionLocal()
+    try:
+        if ensure_search_index(db):
+            safe_print("Search index rebuilt from the database")
+    except Exception as e:
+        # Search degrades to empty results; the API itself stays up
+        safe_print(f"Search index unavailable: {e!r}")
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def build_llm_provider():
+    try:
+        default_provider()
+    except Exception as e:
+        # Chat keeps answering from the fallback responder
+        safe_print(f"ERROR: LLM provider unavailable: {e!r}")
+
+
+@app.on_event("startup")
+def start_metrics_snapshots():
+    metrics.start_snapshot_writer()
+
+
+@app.on_event("shutdown")
+def flush_background_writers():
+    chat_log_writer.stop()
+    # Keep this worker's totals for the others to report after it exits
+    metrics.write_snapshot()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,421 @@
+"""
+Prometheus-style metrics.
+
+Counters, gauges and histograms live in plain per-process dicts, so
+recording one costs a lock, a dict lookup and (for histograms) a bisect.
+Values that already exist elsewhere, such as DB pool usage and cache
+hit/miss counts, are read through callbacks only when a snapshot is taken.
+``GET /metrics`` renders the text exposition format.
+
+Each uvicorn worker is a separate process with its own numbers. When
+``METRICS_MULTIPROCESS_DIR`` is set, every worker writes a JSON snapshot
+there every ``METRICS_FLUSH_SECONDS`` (default 5) and on shutdown. Whichever
+worker serves the scrape merges all the snapshots:
+
+- counters and histograms are summed over every file, including workers
+  that have exited, so totals never go backwards
+- gauges are summed over workers whose snapshot is still fresh
+
+Empty the directory before starting the server, like Prometheus's own
+multiprocess mode.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+
+MULTIPROCESS_DIR = os.getenv("METRICS_MULTIPROCESS_DIR")
+FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+# A gauge snapshot older than this belongs to a worker that has gone away
+GAUGE_STALE_SECONDS = FLUSH_SECONDS * 3
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Starlette appends the charset to text/ media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label values tuple -> value
+        self._lock = threading.Lock()
+
+    def describe(self) -> dict:
+        return {"type": self.kind, "help": self.help, "labelnames": self.labelnames}
+
+    def samples(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels=(), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), callback=None):
+        super().__init__(name, help_text, labelnames)
+        # Callback returns {label values tuple: value}, evaluated on snapshot
+        self.callback = callback
+
+    def inc(self, labels=(), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def samples(self) -> dict:
+        if self.callback is not None:
+            return self.callback()
+        return super().samples()
+
+
+class CallbackCounter(Counter):
+    """Counter whose values are kept elsewhere and read on snapshot"""
+
+    def __init__(self, name: str, help_text: str, labelnames, callback):
+        super().__init__(name, help_text, labelnames)
+        self.callback = callback
+
+    def samples(self) -> dict:
+        return self.callback()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=None):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets or DEFAULT_BUCKETS)
+
+    def describe(self) -> dict:
+        return {**super().describe(), "buckets": self.buckets}
+
+    def observe(self, labels, value: float):
+        # Per-bucket (not cumulative) counts plus +Inf, then sum and count
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> dict:
+        with self._lock:
+            return {
+                labels: [list(counts), total, count]
+                for labels, (counts, total, count) in self._values.items()
+            }
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=(), callback=None) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames, callback))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=None) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def snapshot(self) -> dict:
+        metrics = {}
+        for name, metric in list(self._metrics.items()):
+            try:
+                samples = metric.samples()
+            except Exception:
+                # A broken callback shouldn't take the whole endpoint down
+                continue
+            metrics[name] = {
+                **metric.describe(),
+                "samples": [[list(labels), value] for labels, value in samples.items()],
+            }
+        return {"pid": os.getpid(), "written_at": time.time(), "metrics": metrics}
+
+
+registry = Registry()
+
+
+_snapshot_names = {}  # pid -> file name
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def _snapshot_name() -> str:
+    # One file per worker process, named so a reused pid can't clash; looked
+    # up by pid so workers forked after import don't share a name
+    pid = os.getpid()
+    if pid not in _snapshot_names:
+        _snapshot_names[pid] = f"{pid}-{time.time_ns():x}.json"
+    return _snapshot_names[pid]
+
+
+def write_snapshot():
+    """Write this worker's snapshot for the others to merge"""
+    if not MULTIPROCESS_DIR:
+        return
+    os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+    path = os.path.join(MULTIPROCESS_DIR, _snapshot_name())
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as snapshot_file:
+        json.dump(registry.snapshot(), snapshot_file)
+    os.replace(temp_path, path)
+
+
+def _flush_forever():
+    while True:
+        time.sleep(FLUSH_SECONDS)
+        try:
+            write_snapshot()
+        except OSError:
+            pass
+
+
+def start_snapshot_writer():
+    """Start writing snapshots in the background if running multiprocess"""
+    global _flusher
+    if not MULTIPROCESS_DIR:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(
+                target=_flush_forever, name="metrics-flush", daemon=True
+            )
+            _flusher.start()
+
+
+def _read_snapshots():
+    snapshots = [registry.snapshot()]
+    if not MULTIPROCESS_DIR or not os.path.isdir(MULTIPROCESS_DIR):
+        return snapshots
+    for file_name in os.listdir(MULTIPROCESS_DIR):
+        if file_name == _snapshot_name() or not file_name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(MULTIPROCESS_DIR, file_name)) as snapshot_file:
+                snapshots.append(json.load(snapshot_file))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _merge(snapshots) -> dict:
+    now = time.time()
+    merged = {}
+    for snapshot in snapshots:
+        fresh = now - snapshot["written_at"] <= GAUGE_STALE_SECONDS
+        for name, metric in snapshot["metrics"].items():
+            if metric["type"] == "gauge" and not fresh:
+                continue
+            target = merged.setdefault(name, {**metric, "values": {}})
+            values = target["values"]
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if metric["type"] != "histogram":
+                    values[key] = values.get(key, 0) + value
+                elif key not in values:
+                    values[key] = [list(value[0]), value[1], value[2]]
+                else:
+                    counts, total, count = values[key]
+                    values[key] = [
+                        [a + b for a, b in zip(counts, value[0])],
+                        total + value[1],
+                        count + value[2],
+                    ]
+    return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render() -> str:
+    """Every worker's metrics merged, in Prometheus text format"""
+    lines = []
+    for name, metric in sorted(_merge(_read_snapshots()).items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for labels, value in sorted(metric["values"].items()):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(labelnames, labels)} {_number(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip([*metric["buckets"], float("inf")], counts):
+                cumulative += bucket_count
+                le = (("le", _number(float(bound))),)
+                lines.append(
+                    f"{name}_bucket{_labels(labelnames, labels, le)} {cumulative}"
+                )
+            lines.append(f"{name}_sum{_labels(labelnames, labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labelnames, labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+# Application metrics
+
+http_requests = registry.counter(
+    "mello_http_requests_total",
+    "HTTP requests by route template, method and status code",
+    ("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "mello_http_request_duration_seconds",
+    "HTTP request latency by route template and method",
+    ("method", "route"),
+)
+http_requests_in_progress = registry.gauge(
+    "mello_http_requests_in_progress", "HTTP requests currently being served"
+)
+http_exceptions = registry.counter(
+    "mello_http_exceptions_total",
+    "Requests that raised an unhandled exception, by route template",
+    ("route",),
+)
+
+llm_request_duration = registry.histogram(
+    "mello_llm_request_duration_seconds",
+    "Chat model call latency by provider and outcome",
+    ("provider", "outcome"),
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+)
+llm_tokens = registry.counter(
+    "mello_llm_tokens_total",
+    "Estimated chat model tokens by provider and direction (prompt, completion)",
+    ("provider", "direction"),
+)
+
+firebase_verify_duration = registry.histogram(
+    "mello_firebase_verify_duration_seconds",
+    "Firebase ID token verification latency by outcome",
+    ("outcome",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+def track_db_pool(engine):
+    """Export the engine's connection pool usage"""
+
+    def pool_stats():
+        pool = engine.pool
+        stats = {}
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            reader = getattr(pool, state, None)
+            if reader is not None:
+                stats[(state,)] = reader()
+        return stats
+
+    registry.gauge(
+        "mello_db_pool_connections",
+        "Database connection pool: size, checked in, checked out, overflow",
+        ("state",),
+        callback=pool_stats,
+    )
+
+
+def track_caches(caches: dict):
+    """Export hit, miss and size figures for named TTLCache instances"""
+
+    def lookups():
+        values = {}
+        for name, cache in caches.items():
+            values[(name, "hit")] = cache.hits
+            values[(name, "miss")] = cache.misses
+        return values
+
+    registry.register(
+        CallbackCounter(
+            "mello_cache_lookups_total",
+            "Cache lookups by cache and result (hit, miss)",
+            ("cache", "result"),
+            lookups,
+        )
+    )
+    registry.gauge(
+        "mello_cache_entries",
+        "Entries currently held per cache",
+        ("cache",),
+        callback=lambda: {(name,): len(cache) for name, cache in caches.items()},
+    )
+
+
+class MetricsMiddleware:
+    """Count and time every HTTP request by its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        http_requests_in_progress.inc()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            http_exceptions.inc((_route(scope),))
+            raise
+        finally:
+            http_requests_in_progress.dec()
+            route = _route(scope)
+            method = scope["method"]
+            http_requests.inc((method, route, str(status)))
+            http_request_duration.observe(
+                (method, route), time.perf_counter() - started
+            )
+
+
+def _route(scope) -> str:
+    # The template, not the raw path, so IDs don't explode label cardinality
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 import enum
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
 from database import Base
 from sqlalchemy import (
     Boolean,
+    Date,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -95,6 +97,8 @@ class User(Base):
 
 class ChatbotLog(Base):
     __tablename__ = "chatbot_logs"
+    # Serves per-user history pages and recent-turn lookups newest first
+    __table_args__ = (Index("ix_chatbot_logs_user_timestamp", "user_id", "timestamp"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
@@ -102,15 +106,28 @@ class ChatbotLog(Base):
     response: Mapped[str] = mapped_column(Text, nullable=False)
     category: Mapped[str] = mapped_column(String(50))  # stress, sleep, anxiety, general
     timestamp: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
     )
 
     # Relationships
     user: Mapped[User] = relationship("User", back_populates="chatbot_logs")
 
 
+class ChatDailyRollup(Base):
+    __tablename__ = "chat_daily_rollups"
+
+    # One row per day and category; outlives the archived raw logs
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    category: Mapped[str] = mapped_column(String(50), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 class Booking(Base):
     __tablename__ = "bookings"
+    # Serves the directory's per-request lookup of booked upcoming slots
+    __table_args__ = (
+        Index("ix_bookings_counselor_datetime", "counselor_id", "preferred_datetime"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
@@ -235,7 +252,7 @@ class Feedback(Base):
         Integer, ForeignKey("users.id"), nullable=True
     )
     booking_id: Mapped[int | None] = mapped_column(
-        Integer, ForeignKey("bookings.id"), nullable=True
+        Integer, ForeignKey("bookings.id"), nullable=True, index=True
     )
     session_date: Mapped[datetime] = mapped_column(DateTime)
     feedback_type: Mapped[str] = mapped_column(
@@ -269,6 +286,25 @@ class Feedback(Base):
     booking: Mapped[Booking] = relationship("Booking")
 
 
+class CounselorRating(Base):
+    __tablename__ = "counselor_ratings"
+
+    # Running totals over feedback, maintained by counselor_ratings.record_rating
+    counselor_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id"), primary_key=True
+    )
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    stars_1: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    stars_2: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    stars_3: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    stars_4: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    stars_5: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    recommend_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Feedback that answered would_recommend either way
+    recommend_answers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 class Newsletter(Base):
     __tablename__ = "newsletters"
 
@@ -406,6 +442,14 @@ class AdminAnalytics(Base):
     generator: Mapped[User] = relationship("User")
 
 
+class ContentVersion(Base):
+    __tablename__ = "content_versions"
+
+    # Bumped on every change to a content type; serves as a cheap HTTP validator
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 # Add new relationships to User model
 User.counselor_reports = relationship(
     "CounselorReport", foreign_keys="CounselorReport.counselor_id"
@@ -0,0 +1,78 @@
+"""
+Newsletter list projections and the cached published feed.
+
+Public lists show a summary (title, excerpt, date, author) instead of the
+full body. One query joins the author and reads only the opening of each
+body to build the excerpt. ``get_newsletter_by_id`` and the admin list,
+which feeds the edit form, still return the full content.
+
+Published feed pages are cached per worker. The cache key includes the
+``newsletters`` content version, which ``publish_newsletter`` bumps, so a
+publish makes every worker's cached pages stale at once.
+"""
+
+import html
+import re
+
+from cache import TTLCache
+from models import Newsletter, User
+from sqlalchemy import func
+
+EXCERPT_CHARS = 200
+# Enough of the body to fill an excerpt once markup is stripped
+LEAD_CHARS = 2000
+
+_TAG = re.compile(r"<[^>]*>")
+
+feed_cache = TTLCache(maxsize=64, ttl=3600)
+
+
+def plain_excerpt(content: str) -> str:
+    """Plain-text opening of a body that may contain markup"""
+    text = " ".join(html.unescape(_TAG.sub(" ", content or "")).split())
+    if len(text) <= EXCERPT_CHARS:
+        return text
+    return text[:EXCERPT_CHARS].rsplit(" ", 1)[0] + "..."
+
+
+def summary_query(db):
+    """Newsletter summaries with their author's name, in one query"""
+    return (
+        db.query(
+            Newsletter.id,
+            Newsletter.title,
+            func.substr(Newsletter.content, 1, LEAD_CHARS).label("lead"),
+            Newsletter.published_at,
+            Newsletter.is_published,
+            User.name.label("author_name"),
+        )
+        .outerjoin(User, User.id == Newsletter.author_id)
+        .order_by(Newsletter.published_at.desc())
+    )
+
+
+def summarize(row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "excerpt": plain_excerpt(row.lead),
+        "published_at": row.published_at,
+        "author_name": row.author_name or "Unknown",
+    }
+
+
+def published_feed(db, version: str, limit: int, offset: int) -> list:
+    """A page of published newsletter summaries, cached until the next publish"""
+    key = (version, limit, offset)
+    page = feed_cache.get(key)
+    if page is None:
+        rows = (
+            summary_query(db)
+            .filter(Newsletter.is_published)
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        page = [summarize(row) for row in rows]
+        feed_cache.set(key, page)
+    return page
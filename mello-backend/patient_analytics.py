@@ -0,0 +1,80 @@
+"""
+Cross-worker cache of counselors' patient analytics.
+
+A counselor's analytics depend on their bookings and on their patients'
+assessments, mood entries and chat logs. Every counselor and every patient
+has a generation stamp under ``PATIENT_ANALYTICS_STAMP_DIR`` (default in the
+temp directory), and writers advance the stamp of whoever they already
+know: the patient for their own data, the counselor for a new booking. A
+cached result keeps the generations it was computed under and is served only
+while none of them has moved, which costs one ``stat`` per patient and no
+queries on either side.
+"""
+
+import os
+import tempfile
+import threading
+
+from cache import TTLCache
+from generation_stamp import GenerationStamp
+
+STAMP_DIR = os.getenv(
+    "PATIENT_ANALYTICS_STAMP_DIR",
+    os.path.join(tempfile.gettempdir(), "mello-patient-analytics"),
+)
+
+# counselor id -> (counselor generation, {patient id: generation}, result)
+patient_analytics_cache = TTLCache(maxsize=512, ttl=300)
+
+_stamps = {}  # "counselor-<id>" / "patient-<id>" -> GenerationStamp
+_stamps_lock = threading.Lock()
+
+
+def _stamp(name: str) -> GenerationStamp:
+    stamp = _stamps.get(name)
+    if stamp is None:
+        with _stamps_lock:
+            stamp = _stamps.get(name)
+            if stamp is None:
+                os.makedirs(STAMP_DIR, exist_ok=True)
+                path = os.path.join(STAMP_DIR, f"{name}.stamp")
+                stamp = _stamps[name] = GenerationStamp(path)
+    return stamp
+
+
+def counselor_generation(counselor_id: int) -> str:
+    """Read before listing the counselor's patients"""
+    return _stamp(f"counselor-{counselor_id}").current()
+
+
+def patient_generations(patient_ids) -> dict:
+    """Read before computing the patients' figures, so no write is missed"""
+    return {
+        patient_id: _stamp(f"patient-{patient_id}").current()
+        for patient_id in patient_ids
+    }
+
+
+def cached_analytics(counselor_id: int):
+    """Cached analytics for a counselor, or None if missing or out of date"""
+    entry = patient_analytics_cache.get(counselor_id)
+    if entry is None:
+        return None
+    generation, patients, result = entry
+    if generation != counselor_generation(counselor_id):
+        return None
+    if patient_generations(patients) != patients:
+        return None
+    return result
+
+
+def store_analytics(counselor_id: int, generation: str, patients: dict, result):
+    patient_analytics_cache.set(counselor_id, (generation, patients, result))
+
+
+def invalidate_patient_analytics(patient_ids=(), counselor_id=None):
+    """Make every worker recompute analytics covering these patients or counselor"""
+    for patient_id in set(patient_ids):
+        _stamp(f"patient-{patient_id}").advance()
+    if counselor_id is not None:
+        _stamp(f"counselor-{counselor_id}").advance()
@@ -0,0 +1,150 @@
+"""
+Per-request SQL instrumentation.
+
+Engine events time every statement and add it to the stats of the request
+that issued it (tracked with a context variable, so statements from
+background threads aren't attributed to a request). ``QueryStatsMiddleware``
+opens the stats for each HTTP request and reports them:
+
+- with ``DEBUG`` set, as ``X-DB-Query-Count``, ``X-DB-Time-Ms`` and
+  ``X-DB-Slowest-Ms`` response headers
+- otherwise, as one JSON log line per request that ran any statements
+
+Any statement slower than ``SLOW_QUERY_MS`` (default 200) is also logged on
+its own with its SQL, in either mode.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from firebase_config import safe_print
+from sqlalchemy import event
+
+DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+STATEMENT_CHARS = 500
+
+_current = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """Statement count and timings for one request"""
+
+    __slots__ = ("count", "total_ms", "slowest_ms", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement = None
+
+    def add(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+
+def _short(statement: str) -> str:
+    return " ".join(statement.split())[:STATEMENT_CHARS]
+
+
+def _log(record: dict):
+    safe_print(json.dumps(record, default=str))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is discarded with the statement
+    # whether it succeeds or fails
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, elapsed_ms)
+    if elapsed_ms >= SLOW_QUERY_MS:
+        _log(
+            {
+                "event": "slow_query",
+                "duration_ms": round(elapsed_ms, 2),
+                "statement": _short(statement),
+            }
+        )
+
+
+@contextmanager
+def track_queries():
+    """Collect stats for the statements run inside the block"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def instrument_engine(engine):
+    """Time every statement the engine runs; safe to call more than once"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app, debug: bool = DEBUG):
+        self.app = app
+        self.debug = debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        status = None
+
+        async def send_with_stats(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.debug:
+                    message = {
+                        **message,
+                        "headers": [
+                            *message.get("headers", []),
+                            (b"x-db-query-count", str(stats.count).encode()),
+                            (b"x-db-time-ms", f"{stats.total_ms:.2f}".encode()),
+                            (b"x-db-slowest-ms", f"{stats.slowest_ms:.2f}".encode()),
+                        ],
+                    }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            if not self.debug and stats.count:
+                _log(
+                    {
+                        "event": "request_queries",
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "query_count": stats.count,
+                        "db_time_ms": round(stats.total_ms, 2),
+                        "slowest_ms": round(stats.slowest_ms, 2),
+                        "slowest_statement": _short(stats.slowest_statement),
+                    }
+                )
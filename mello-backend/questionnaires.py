@@ -0,0 +1,279 @@
+"""
+Registry of the standardised assessment questionnaires (PHQ-9, GAD-7, GHQ-12).
+
+Question text, answer scale, validation rules and severity bands all live
+here so the questions served to clients and the scoring applied on submit
+cannot drift apart. Bump an instrument's ``version`` whenever its text or
+scoring changes; the served payloads and their ETags are derived from it.
+
+Scoring keys read by ``scoring.py``:
+
+- ``response_range``: lowest and highest accepted answer value
+- ``item_values``: points for each answer value (defaults to the value itself)
+- ``item_weights``: per-question multiplier (defaults to 1)
+- ``reverse_items``: zero-based questions whose answer scale is reversed
+- ``bands``: ascending (highest score in band, severity, recommendation)
+
+A new instrument only needs an entry here to be served and scored.
+"""
+
+import hashlib
+import json
+
+DEFAULT_LANGUAGE = "en"
+
+QUESTIONNAIRES = {
+    "phq9": {
+        "name": "PHQ-9",
+        "version": 1,
+        "response_range": (0, 3),
+        # (highest total score in band, severity, recommendation)
+        "bands": [
+            (
+                4,
+                "Minimal depression",
+                "Your responses suggest minimal depression symptoms. Continue maintaining good mental health habits.",
+            ),
+            (
+                9,
+                "Mild depression",
+                "Your responses suggest mild depression symptoms. Consider speaking with a counselor or trying stress-reduction techniques.",
+            ),
+            (
+                14,
+                "Moderate depression",
+                "Your responses suggest moderate depression symptoms. We recommend booking a session with one of our counselors for professional support.",
+            ),
+            (
+                19,
+                "Moderately severe depression",
+                "Your responses suggest moderately severe depression symptoms. Please consider booking a counselor session and speaking with a healthcare provider.",
+            ),
+            (
+                27,
+                "Severe depression",
+                "Your responses suggest severe depression symptoms. Please seek immediate professional help and consider booking an urgent counselor session.",
+            ),
+        ],
+        "text": {
+            "en": {
+                "title": "PHQ-9 Depression Assessment",
+                "description": "Over the last 2 weeks, how often have you been bothered by any of the following problems?",
+                "scale": [
+                    "Not at all",
+                    "Several days",
+                    "More than half the days",
+                    "Nearly every day",
+                ],
+                "questions": [
+                    "Little interest or pleasure in doing things",
+                    "Feeling down, depressed, or hopeless",
+                    "Trouble falling or staying asleep, or sleeping too much",
+                    "Feeling tired or having little energy",
+                    "Poor appetite or overeating",
+                    "Feeling bad about yourself or that you are a failure or have let yourself or your family down",
+                    "Trouble concentrating on things, such as reading the newspaper or watching television",
+                    "Moving or speaking so slowly that other people could have noticed, or the opposite being so fidgety or restless that you have been moving around a lot more than usual",
+                    "Thoughts that you would be better off dead, or of hurting yourself",
+                ],
+            },
+            "hi": {
+                "title": "PHQ-9 अवसाद मूल्यांकन",
+                "description": "पिछले 2 हफ़्तों में, आप निम्नलिखित में से किसी भी समस्या से कितनी बार परेशान हुए हैं?",
+                "scale": [
+                    "बिल्कुल नहीं",
+                    "कुछ दिन",
+                    "आधे से अधिक दिन",
+                    "लगभग हर दिन",
+                ],
+                "questions": [
+                    "काम करने में कम रुचि या आनंद",
+                    "उदास, निराश या हताश महसूस करना",
+                    "सोने में या सोते रहने में परेशानी, या बहुत अधिक सोना",
+                    "थकान महसूस करना या ऊर्जा की कमी",
+                    "भूख कम लगना या ज़रूरत से ज़्यादा खाना",
+                    "अपने बारे में बुरा महसूस करना, कि आप असफल हैं या आपने स्वयं को या अपने परिवार को निराश किया है",
+                    "चीज़ों पर ध्यान केंद्रित करने में परेशानी, जैसे अख़बार पढ़ना या टेलीविज़न देखना",
+                    "इतना धीरे चलना या बोलना कि दूसरों ने ध्यान दिया हो, या इसके विपरीत, इतना बेचैन रहना कि आप सामान्य से कहीं अधिक इधर-उधर घूमते रहे हों",
+                    "यह विचार कि आपके लिए मर जाना बेहतर होगा, या स्वयं को किसी तरह चोट पहुँचाने के विचार",
+                ],
+            },
+        },
+    },
+    "gad7": {
+        "name": "GAD-7",
+        "version": 1,
+        "response_range": (0, 3),
+        "bands": [
+            (
+                4,
+                "Minimal anxiety",
+                "Your responses suggest minimal anxiety symptoms. Keep up your current coping strategies.",
+            ),
+            (
+                9,
+                "Mild anxiety",
+                "Your responses suggest mild anxiety symptoms. Try relaxation techniques and consider our wellness resources.",
+            ),
+            (
+                14,
+                "Moderate anxiety",
+                "Your responses suggest moderate anxiety symptoms. We recommend booking a counselor session and exploring our anxiety resources.",
+            ),
+            (
+                21,
+                "Severe anxiety",
+                "Your responses suggest severe anxiety symptoms. Please book a counselor session and consider speaking with a healthcare provider.",
+            ),
+        ],
+        "text": {
+            "en": {
+                "title": "GAD-7 Anxiety Assessment",
+                "description": "Over the last 2 weeks, how often have you been bothered by the following problems?",
+                "scale": [
+                    "Not at all",
+                    "Several days",
+                    "More than half the days",
+                    "Nearly every day",
+                ],
+                "questions": [
+                    "Feeling nervous, anxious, or on edge",
+                    "Not being able to stop or control worrying",
+                    "Worrying too much about different things",
+                    "Trouble relaxing",
+                    "Being so restless that it is hard to sit still",
+                    "Becoming easily annoyed or irritable",
+                    "Feeling afraid, as if something awful might happen",
+                ],
+            },
+            "hi": {
+                "title": "GAD-7 चिंता मूल्यांकन",
+                "description": "पिछले 2 हफ़्तों में, आप निम्नलिखित समस्याओं से कितनी बार परेशान हुए हैं?",
+                "scale": [
+                    "बिल्कुल नहीं",
+                    "कुछ दिन",
+                    "आधे से अधिक दिन",
+                    "लगभग हर दिन",
+                ],
+                "questions": [
+                    "घबराहट, चिंता या बेचैनी महसूस करना",
+                    "चिंता करना रोक न पाना या उस पर नियंत्रण न कर पाना",
+                    "अलग-अलग बातों को लेकर बहुत ज़्यादा चिंता करना",
+                    "आराम करने में परेशानी",
+                    "इतना बेचैन होना कि शांत बैठना मुश्किल हो",
+                    "आसानी से नाराज़ या चिड़चिड़ा हो जाना",
+                    "डर लगना, जैसे कुछ बहुत बुरा होने वाला हो",
+                ],
+            },
+        },
+    },
+    "ghq": {
+        "name": "GHQ-12",
+        "version": 1,
+        "response_range": (0, 3),
+        # GHQ uses the 0-0-1-1 scoring method
+        "item_values": [0, 0, 1, 1],
+        "bands": [
+            (
+                2,
+                "Good mental health",
+                "Your responses suggest good overall mental health. Continue your current wellness practices.",
+            ),
+            (
+                5,
+                "Mild distress",
+                "Your responses suggest mild psychological distress. Consider our wellness resources and stress management techniques.",
+            ),
+            (
+                8,
+                "Moderate distress",
+                "Your responses suggest moderate psychological distress. We recommend booking a counselor session for support.",
+            ),
+            (
+                12,
+                "Severe distress",
+                "Your responses suggest significant psychological distress. Please book a counselor session and consider professional help.",
+            ),
+        ],
+        "text": {
+            "en": {
+                "title": "GHQ-12 General Health Questionnaire",
+                "description": "Have you recently:",
+                "scale": [
+                    "Better than usual",
+                    "Same as usual",
+                    "Less than usual",
+                    "Much less than usual",
+                ],
+                "questions": [
+                    "Been able to concentrate on whatever you're doing?",
+                    "Lost much sleep over worry?",
+                    "Felt that you were playing a useful part in things?",
+                    "Felt capable of making decisions about things?",
+                    "Felt constantly under strain?",
+                    "Felt you couldn't overcome your difficulties?",
+                    "Been able to enjoy your normal day-to-day activities?",
+                    "Been able to face up to problems?",
+                    "Been feeling unhappy or depressed?",
+                    "Been losing confidence in yourself?",
+                    "Been thinking of yourself as a worthless person?",
+                    "Been feeling reasonably happy, all things considered?",
+                ],
+            },
+            "hi": {
+                "title": "GHQ-12 सामान्य स्वास्थ्य प्रश्नावली",
+                "description": "क्या हाल ही में आप:",
+                "scale": [
+                    "सामान्य से बेहतर",
+                    "सामान्य जैसा",
+                    "सामान्य से कम",
+                    "सामान्य से बहुत कम",
+                ],
+                "questions": [
+                    "जो भी कर रहे हैं उस पर ध्यान केंद्रित कर पाए हैं?",
+                    "चिंता के कारण आपकी नींद बहुत कम हुई है?",
+                    "महसूस किया है कि आप चीज़ों में उपयोगी भूमिका निभा रहे हैं?",
+                    "चीज़ों के बारे में निर्णय लेने में सक्षम महसूस किया है?",
+                    "लगातार तनाव में महसूस किया है?",
+                    "महसूस किया है कि आप अपनी कठिनाइयों से पार नहीं पा सकते?",
+                    "अपनी सामान्य दिनचर्या की गतिविधियों का आनंद ले पाए हैं?",
+                    "समस्याओं का सामना कर पाए हैं?",
+                    "दुखी या उदास महसूस कर रहे हैं?",
+                    "अपना आत्मविश्वास खो रहे हैं?",
+                    "स्वयं को एक बेकार व्यक्ति समझ रहे हैं?",
+                    "सब कुछ देखते हुए, यथोचित रूप से खुश महसूस कर रहे हैं?",
+                ],
+            },
+        },
+    },
+}
+
+
+def _compile(assessment_type: str, language: str):
+    questionnaire = QUESTIONNAIRES[assessment_type]
+    payload = {
+        **questionnaire["text"][language],
+        "assessment_type": assessment_type,
+        "version": questionnaire["version"],
+        "language": language,
+    }
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    etag = f'"{assessment_type}-v{questionnaire["version"]}-{language}-{digest}"'
+    return body, etag
+
+
+# Serialised once at import: (assessment_type, language) -> (body, etag)
+_COMPILED = {
+    (assessment_type, language): _compile(assessment_type, language)
+    for assessment_type, questionnaire in QUESTIONNAIRES.items()
+    for language in questionnaire["text"]
+}
+
+
+def compiled_questions(assessment_type: str, language: str = DEFAULT_LANGUAGE):
+    """Return the pre-serialised (body, etag) for a questionnaire, or None"""
+    compiled = _COMPILED.get((assessment_type, language))
+    if compiled is None:
+        compiled = _COMPILED.get((assessment_type, DEFAULT_LANGUAGE))
+    return compiled
@@ -0,0 +1,73 @@
+"""
+In-memory resource catalogue.
+
+Resources change only when an admin uploads one, so every worker keeps the
+whole catalogue in memory with an index per filterable facet and serves
+reads without touching the database.
+
+Uploads call ``invalidate_resource_catalogue()``, which moves the
+``RESOURCE_CATALOGUE_STAMP`` generation stamp (default in the temp
+directory) that every worker checks before serving.
+"""
+
+import os
+import tempfile
+
+from generation_stamp import StampedSnapshot, facet_filter
+from models import Resource
+
+STAMP_PATH = os.getenv(
+    "RESOURCE_CATALOGUE_STAMP",
+    os.path.join(tempfile.gettempdir(), "mello-resource-catalogue.stamp"),
+)
+
+FACETS = ("category", "language", "type")
+
+
+class ResourceCatalogue:
+    """Snapshot of all resources with per-facet position indexes"""
+
+    def __init__(self, resources, generation: str):
+        self.generation = generation
+        self.etag = f'W/"resources-{generation}"'
+        self.items = [
+            {
+                "id": resource.id,
+                "title": resource.title,
+                "type": resource.type,
+                "language": resource.language,
+                "url": resource.url,
+                "description": resource.description,
+                "category": resource.category,
+                "duration": resource.duration,
+            }
+            for resource in resources
+        ]
+        self.by_id = {item["id"]: item for item in self.items}
+        self.facets = {facet: {} for facet in FACETS}
+        for position, item in enumerate(self.items):
+            for facet in FACETS:
+                self.facets[facet].setdefault(item[facet], []).append(position)
+        self.categories = list(self.facets["category"])
+
+    def filter(self, **criteria):
+        """Items matching every given facet value, in catalogue order"""
+        return facet_filter(self.items, self.facets, criteria)
+
+
+def _load(db, generation: str) -> ResourceCatalogue:
+    resources = db.query(Resource).order_by(Resource.id).all()
+    return ResourceCatalogue(resources, generation)
+
+
+_catalogue = StampedSnapshot(STAMP_PATH, _load)
+
+
+def get_catalogue() -> ResourceCatalogue:
+    """Current catalogue, rebuilt from the database if another writer moved on"""
+    return _catalogue.get()
+
+
+def invalidate_resource_catalogue():
+    """Make every worker rebuild its catalogue; call after committing a change"""
+    _catalogue.invalidate()
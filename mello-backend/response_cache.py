@@ -0,0 +1,131 @@
+"""
+Cache of chatbot replies for repeated questions.
+
+Replies are keyed on the normalised message plus the system prompt version,
+so changing the prompt naturally retires old answers. With a similarity
+threshold set, a miss falls back to near-duplicate matching: messages are
+reduced to character shingles and the cached message with the highest
+Jaccard similarity above the threshold is reused.
+"""
+
+import os
+import unicodedata
+
+from cache import TTLCache
+
+SHINGLE_SIZE = 4
+
+
+# ASCII punctuation and symbols, the common case, mapped in one C-level pass
+_ASCII_SEPARATORS = str.maketrans(
+    {
+        chr(code): " "
+        for code in range(128)
+        if unicodedata.category(chr(code))[0] in "PS"
+    }
+)
+
+
+def normalize_folded(folded: str) -> str:
+    """Normalise an already casefolded message"""
+    if folded.isascii():
+        return " ".join(folded.translate(_ASCII_SEPARATORS).split())
+    return " ".join(
+        "".join(
+            " " if unicodedata.category(char)[0] in "PS" else char for char in folded
+        ).split()
+    )
+
+
+def normalize_message(message: str) -> str:
+    """Casefold, drop punctuation/symbols and collapse whitespace"""
+    return normalize_folded(message.casefold())
+
+
+def shingles(normalized: str) -> frozenset:
+    padded = f" {normalized} "
+    if len(padded) <= SHINGLE_SIZE:
+        return frozenset([padded])
+    return frozenset(
+        padded[i : i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)
+    )
+
+
+class ResponseCache(TTLCache):
+    """LRU/TTL reply cache with optional near-duplicate lookup"""
+
+    def __init__(self, maxsize=1024, ttl=3600, similarity=None):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.similarity = similarity
+        self.similar_hits = 0
+        self._shingles = {}  # key -> shingle set
+        self._index = {}  # shingle -> keys containing it
+
+    def lookup(self, normalized: str, prompt_version: str):
+        """Return a cached reply for the message, or None"""
+        key = (prompt_version, normalized)
+        response = self.get(key)
+        if response is not None or not self.similarity:
+            return response
+
+        similar_key = self._most_similar(key)
+        if similar_key is None:
+            return None
+        response = self.get(similar_key)
+        if response is not None:
+            self.similar_hits += 1
+        return response
+
+    def store(self, normalized: str, prompt_version: str, response: str):
+        key = (prompt_version, normalized)
+        self.set(key, response)
+        if self.similarity:
+            with self._lock:
+                if key in self._data and key not in self._shingles:
+                    key_shingles = shingles(normalized)
+                    self._shingles[key] = key_shingles
+                    for shingle in key_shingles:
+                        self._index.setdefault(shingle, set()).add(key)
+
+    def clear(self):
+        with self._lock:
+            self._shingles.clear()
+            self._index.clear()
+        super().clear()
+
+    def _most_similar(self, key):
+        prompt_version, normalized = key
+        query = shingles(normalized)
+        with self._lock:
+            overlap = {}
+            for shingle in query:
+                for candidate in self._index.get(shingle, ()):
+                    if candidate[0] == prompt_version:
+                        overlap[candidate] = overlap.get(candidate, 0) + 1
+
+            best_key, best_score = None, self.similarity
+            for candidate, shared in overlap.items():
+                union = len(query) + len(self._shingles[candidate]) - shared
+                score = shared / union
+                if score >= best_score:
+                    best_key, best_score = candidate, score
+            return best_key
+
+    def _remove(self, key):
+        super()._remove(key)
+        for shingle in self._shingles.pop(key, ()):
+            keys = self._index.get(shingle)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[shingle]
+
+
+# Near-duplicate matching is off unless a Jaccard threshold (e.g. 0.7) is set
+_similarity = os.getenv("CHAT_CACHE_SIMILARITY")
+
+chat_response_cache = ResponseCache(
+    maxsize=int(os.getenv("CHAT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CHAT_CACHE_TTL", "3600")),
+    similarity=float(_similarity) if _similarity else None,
+)
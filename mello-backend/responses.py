@@ -0,0 +1,22 @@
+"""
+orjson-backed JSON responses.
+
+``FastJSONResponse`` is the app's default response class, so every endpoint
+gets orjson's encoder. List-heavy endpoints return it directly to also skip
+FastAPI's ``jsonable_encoder`` pass over each row. Output matches the stdlib
+response: datetimes as ISO 8601, enums as their values, and anything orjson
+doesn't know (pydantic models, Decimal, sets) goes through
+``jsonable_encoder``.
+"""
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        # Non-string keys (ints, None, enums) are stringified like json.dumps
+        return orjson.dumps(
+            content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS
+        )
@@ -1,13 +1,16 @@
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from auth import get_admin_user
+from chat_archive import chat_counts, utc_today
+from counselor_directory import invalidate_counselor_directory
 from database import get_db
 from fastapi import APIRouter, Depends, HTTPException
+from http_cache import NEWSLETTERS, bump_content_version
 from models import (
     Assessment,
     Booking,
-    ChatbotLog,
     CounselorReport,
     CounselorStatus,
     ForumPost,
@@ -18,7 +21,11 @@ from models import (
     User,
     UserRole,
 )
+from newsletter_feed import feed_cache
 from pydantic import BaseModel
+from resource_catalogue import invalidate_resource_catalogue
+from responses import FastJSONResponse
+from search_index import index_forum_post, index_newsletter, index_resource
 from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
 
@@ -99,6 +106,7 @@ async def approve_counselor(
         raise HTTPException(status_code=400, detail="Invalid status")
 
     db.commit()
+    invalidate_counselor_directory()
     return {"message": f"Counselor {approval.status} successfully"}
 
 
@@ -123,6 +131,8 @@ async def upload_resource(
     db.add(new_resource)
     db.commit()
     db.refresh(new_resource)
+    invalidate_resource_catalogue()
+    index_resource(new_resource)
 
     return {"message": "Resource uploaded successfully", "resource_id": new_resource.id}
 
@@ -266,39 +276,19 @@ async def get_chat_analytics(
     admin: User = Depends(get_admin_user), db: Session = Depends(get_db), days: int = 30
 ):
     """Get chatbot analytics"""
-    start_date = datetime.now() - timedelta(days=days)
-
-    # Chat categories breakdown
-    category_breakdown = (
-        db.query(ChatbotLog.category, func.count(ChatbotLog.id).label("count"))
-        .filter(ChatbotLog.timestamp >= start_date)
-        .group_by(ChatbotLog.category)
-        .all()
-    )
-
-    # Daily chat volume
-    daily_chats = (
-        db.query(
-            func.date(ChatbotLog.timestamp).label("date"),
-            func.count(ChatbotLog.id).label("count"),
-        )
-        .filter(ChatbotLog.timestamp >= start_date)
-        .group_by(func.date(ChatbotLog.timestamp))
-        .all()
-    )
-
-    # Most common issues
-    total_chats = (
-        db.query(ChatbotLog).filter(ChatbotLog.timestamp >= start_date).count()
-    )
+    # Rollups cover archived days, so this never scans the full log table
+    counts = chat_counts(db, utc_today() - timedelta(days=days))
+    category_breakdown = Counter()
+    daily_volume = Counter()
+    for (day, category), count in counts.items():
+        category_breakdown[category] += count
+        daily_volume[day] += count
 
     return {
-        "total_chats": total_chats,
-        "category_breakdown": {
-            category: count for category, count in category_breakdown
-        },
+        "total_chats": sum(counts.values()),
+        "category_breakdown": dict(category_breakdown),
         "daily_volume": [
-            {"date": str(date), "count": count} for date, count in daily_chats
+            {"date": day, "count": count} for day, count in sorted(daily_volume.items())
         ],
     }
 
@@ -318,8 +308,10 @@ async def create_newsletter(
     )
 
     db.add(new_newsletter)
+    bump_content_version(db, NEWSLETTERS)
     db.commit()
     db.refresh(new_newsletter)
+    index_newsletter(new_newsletter)
 
     return {
         "message": "Newsletter created successfully",
@@ -331,9 +323,12 @@ async def create_newsletter(
 async def get_newsletters(
     admin: User = Depends(get_admin_user), db: Session = Depends(get_db)
 ):
-    """Get all newsletters"""
-    newsletters = db.query(Newsletter).order_by(Newsletter.published_at.desc()).all()
-
+    """Get all newsletters, published or not, with their full content for editing"""
+    rows = (
+        db.query(Newsletter, User.name.label("author_name"))
+        .outerjoin(User, User.id == Newsletter.author_id)
+        .order_by(Newsletter.published_at.desc())
+    )
     return [
         {
             "id": newsletter.id,
@@ -341,12 +336,9 @@ async def get_newsletters(
             "content": newsletter.content,
             "is_published": newsletter.is_published,
             "published_at": newsletter.published_at,
-            "author_name": db.query(User)
-            .filter(User.id == newsletter.author_id)
-            .first()
-            .name,
+            "author_name": author_name or "Unknown",
         }
-        for newsletter in newsletters
+        for newsletter, author_name in rows
     ]
 
 
@@ -364,8 +356,12 @@ async def publish_newsletter(
     newsletter.is_published = not newsletter.is_published
     if newsletter.is_published:
         newsletter.published_at = datetime.now(timezone.utc)
+    bump_content_version(db, NEWSLETTERS)
 
     db.commit()
+    # Pages keyed by the old version can't be hit again; free them now
+    feed_cache.clear()
+    index_newsletter(newsletter)
     return {
         "message": f"Newsletter {'published' if newsletter.is_published else 'unpublished'} successfully"
     }
@@ -411,12 +407,14 @@ async def moderate_post_v2(
         post.moderated_by = admin.id
         post.moderation_action = "approved"
         db.commit()
+        index_forum_post(post)
         return {"message": "Post approved"}
     elif action == "remove":
         post.is_moderated = True
         post.moderated_by = admin.id
         post.moderation_action = "removed"
         db.commit()
+        index_forum_post(post)
         return {"message": "Post removed"}
     else:
         raise HTTPException(status_code=400, detail="Invalid action")
@@ -451,7 +449,7 @@ async def get_all_appointments(
             }
         )
 
-    return result
+    return FastJSONResponse(result)
 
 
 @router.get("/counselor-reports")
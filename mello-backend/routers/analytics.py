@@ -1,8 +1,10 @@
+from collections import Counter
 from datetime import datetime, timedelta
 
+from chat_archive import chat_counts, utc_today
 from database import get_db
 from fastapi import APIRouter, Depends
-from models import Booking, ChatbotLog, Post
+from models import Booking, Post
 from schemas import AnalyticsResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -14,17 +16,12 @@ router = APIRouter()
 async def get_analytics(db: Session = Depends(get_db)):
     """Get analytics data for admin dashboard"""
 
-    # Total chatbot interactions
-    total_interactions = db.query(ChatbotLog).count()
-
-    # Category breakdown for chatbot interactions
-    category_data = (
-        db.query(ChatbotLog.category, func.count(ChatbotLog.id).label("count"))
-        .group_by(ChatbotLog.category)
-        .all()
-    )
-
-    category_breakdown = {cat: count for cat, count in category_data}
+    # Chatbot interactions, including archived days
+    category_breakdown = Counter()
+    for (_, category), count in chat_counts(db).items():
+        category_breakdown[category] += count
+    total_interactions = sum(category_breakdown.values())
+    category_breakdown = dict(category_breakdown)
 
     # Total bookings
     total_bookings = db.query(Booking).count()
@@ -65,15 +62,9 @@ async def get_trends(days: int = 7, db: Session = Depends(get_db)):
     start_date = datetime.now() - timedelta(days=days)
 
     # Daily interaction counts
-    daily_interactions = (
-        db.query(
-            func.date(ChatbotLog.timestamp).label("date"),
-            func.count(ChatbotLog.id).label("count"),
-        )
-        .filter(ChatbotLog.timestamp >= start_date)
-        .group_by(func.date(ChatbotLog.timestamp))
-        .all()
-    )
+    daily_interactions = Counter()
+    for (day, _), count in chat_counts(db, utc_today() - timedelta(days=days)).items():
+        daily_interactions[day] += count
 
     # Daily booking counts
     daily_bookings = (
@@ -88,7 +79,8 @@ async def get_trends(days: int = 7, db: Session = Depends(get_db)):
 
     return {
         "daily_interactions": [
-            {"date": str(date), "count": count} for date, count in daily_interactions
+            {"date": day, "count": count}
+            for day, count in sorted(daily_interactions.items())
         ],
         "daily_bookings": [
             {"date": str(date), "count": count} for date, count in daily_bookings
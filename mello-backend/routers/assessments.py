@@ -1,85 +1,33 @@
 import json
+import time
 from datetime import datetime, timezone
 
+from auth import get_admin_user
 from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from http_cache import etag_matches
 from models import Assessment, User
-from schemas import AssessmentHistory, AssessmentResponse, AssessmentSubmission
+from patient_analytics import invalidate_patient_analytics
+from questionnaires import DEFAULT_LANGUAGE, compiled_questions
+from schemas import (
+    AssessmentBatchSubmission,
+    AssessmentHistory,
+    AssessmentResponse,
+    AssessmentSubmission,
+)
+from scoring import get_scorer
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
+# Questionnaire payloads only change with a deploy that bumps their version
+QUESTIONS_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
 
-# Assessment scoring logic
-def calculate_phq9_score(responses):
-    """Calculate PHQ-9 depression score and severity"""
-    total_score = sum(responses)
-
-    if total_score <= 4:
-        severity = "Minimal depression"
-        recommendations = "Your responses suggest minimal depression symptoms. Continue maintaining good mental health habits."
-    elif total_score <= 9:
-        severity = "Mild depression"
-        recommendations = "Your responses suggest mild depression symptoms. Consider speaking with a counselor or trying stress-reduction techniques."
-    elif total_score <= 14:
-        severity = "Moderate depression"
-        recommendations = "Your responses suggest moderate depression symptoms. We recommend booking a session with one of our counselors for professional support."
-    elif total_score <= 19:
-        severity = "Moderately severe depression"
-        recommendations = "Your responses suggest moderately severe depression symptoms. Please consider booking a counselor session and speaking with a healthcare provider."
-    else:
-        severity = "Severe depression"
-        recommendations = "Your responses suggest severe depression symptoms. Please seek immediate professional help and consider booking an urgent counselor session."
-
-    return total_score, severity, recommendations
-
-
-def calculate_gad7_score(responses):
-    """Calculate GAD-7 anxiety score and severity"""
-    total_score = sum(responses)
-
-    if total_score <= 4:
-        severity = "Minimal anxiety"
-        recommendations = "Your responses suggest minimal anxiety symptoms. Keep up your current coping strategies."
-    elif total_score <= 9:
-        severity = "Mild anxiety"
-        recommendations = "Your responses suggest mild anxiety symptoms. Try relaxation techniques and consider our wellness resources."
-    elif total_score <= 14:
-        severity = "Moderate anxiety"
-        recommendations = "Your responses suggest moderate anxiety symptoms. We recommend booking a counselor session and exploring our anxiety resources."
-    else:
-        severity = "Severe anxiety"
-        recommendations = "Your responses suggest severe anxiety symptoms. Please book a counselor session and consider speaking with a healthcare provider."
-
-    return total_score, severity, recommendations
-
-
-def calculate_ghq_score(responses):
-    """Calculate GHQ-12 general health score and severity"""
-    # GHQ uses 0-0-1-1 scoring method
-    ghq_responses = []
-    for response in responses:
-        if response <= 1:
-            ghq_responses.append(0)
-        else:
-            ghq_responses.append(1)
-
-    total_score = sum(ghq_responses)
-
-    if total_score <= 2:
-        severity = "Good mental health"
-        recommendations = "Your responses suggest good overall mental health. Continue your current wellness practices."
-    elif total_score <= 5:
-        severity = "Mild distress"
-        recommendations = "Your responses suggest mild psychological distress. Consider our wellness resources and stress management techniques."
-    elif total_score <= 8:
-        severity = "Moderate distress"
-        recommendations = "Your responses suggest moderate psychological distress. We recommend booking a counselor session for support."
-    else:
-        severity = "Severe distress"
-        recommendations = "Your responses suggest significant psychological distress. Please book a counselor session and consider professional help."
+# Upper bound for a single screening-drive upload
+MAX_BATCH_SIZE = 1000
 
-    return total_score, severity, recommendations
+MAX_HISTORY_PAGE = 100
 
 
 @router.post("/submit", response_model=AssessmentResponse)
@@ -100,33 +48,14 @@ async def submit_assessment(
             db.commit()
             db.refresh(user)
 
-        # Calculate score based on assessment type
-        if assessment.assessment_type == "phq9":
-            if len(assessment.responses) != 9:
-                raise HTTPException(
-                    status_code=400, detail="PHQ-9 requires exactly 9 responses"
-                )
-            total_score, severity, recommendations = calculate_phq9_score(
-                assessment.responses
-            )
-        elif assessment.assessment_type == "gad7":
-            if len(assessment.responses) != 7:
-                raise HTTPException(
-                    status_code=400, detail="GAD-7 requires exactly 7 responses"
-                )
-            total_score, severity, recommendations = calculate_gad7_score(
-                assessment.responses
-            )
-        elif assessment.assessment_type == "ghq":
-            if len(assessment.responses) != 12:
-                raise HTTPException(
-                    status_code=400, detail="GHQ-12 requires exactly 12 responses"
-                )
-            total_score, severity, recommendations = calculate_ghq_score(
-                assessment.responses
-            )
-        else:
+        scorer = get_scorer(assessment.assessment_type)
+        if scorer is None:
             raise HTTPException(status_code=400, detail="Invalid assessment type")
+        error = scorer.validate(assessment.responses)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+
+        total_score, severity, recommendations = scorer.score(assessment.responses)
 
         # Save assessment
         new_assessment = Assessment(
@@ -142,6 +71,7 @@ async def submit_assessment(
         db.add(new_assessment)
         db.commit()
         db.refresh(new_assessment)
+        invalidate_patient_analytics(patient_ids=[user.id])
 
         # Return properly formatted response
         return {
@@ -154,14 +84,136 @@ async def submit_assessment(
             "completed_at": new_assessment.completed_at,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error submitting assessment: {str(e)}"
         )
 
 
+@router.post("/submit/batch")
+async def submit_assessment_batch(
+    batch: AssessmentBatchSubmission,
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    """Validate, score and store many assessments in one transaction (admins only)"""
+    if len(batch.submissions) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large, at most {MAX_BATCH_SIZE} submissions allowed",
+        )
+
+    started = time.perf_counter()
+    results = [None] * len(batch.submissions)
+
+    # Validate everything up front and group valid entries by instrument
+    by_type = {}
+    for index, submission in enumerate(batch.submissions):
+        scorer = get_scorer(submission.assessment_type)
+        error = (
+            "Invalid assessment type"
+            if scorer is None
+            else scorer.validate(submission.responses)
+        )
+        if error:
+            results[index] = {"index": index, "status": "rejected", "error": error}
+        else:
+            by_type.setdefault(submission.assessment_type, []).append(index)
+
+    accepted = [index for indexes in by_type.values() for index in indexes]
+    if accepted:
+        try:
+            # Resolve all students with one query and bulk-create the missing ones
+            student_ids = {batch.submissions[index].student_id for index in accepted}
+            user_ids = dict(
+                db.query(User.firebase_uid, User.id).filter(
+                    User.firebase_uid.in_(student_ids)
+                )
+            )
+            missing = student_ids - user_ids.keys()
+            if missing:
+                db.execute(
+                    insert(User),
+                    [
+                        {
+                            "firebase_uid": student_id,
+                            "name": f"Student_{student_id}",
+                            "email": f"{student_id}@college.edu",
+                        }
+                        for student_id in missing
+                    ],
+                )
+                user_ids.update(
+                    db.query(User.firebase_uid, User.id).filter(
+                        User.firebase_uid.in_(missing)
+                    )
+                )
+
+            completed_at = datetime.now(timezone.utc)
+            rows = []
+            for assessment_type, indexes in by_type.items():
+                submissions = [batch.submissions[index] for index in indexes]
+                scores = get_scorer(assessment_type).score_many(
+                    [submission.responses for submission in submissions]
+                )
+                for index, submission, (total_score, severity, recommendations) in zip(
+                    indexes, submissions, scores
+                ):
+                    rows.append(
+                        {
+                            "user_id": user_ids[submission.student_id],
+                            "assessment_type": assessment_type,
+                            "responses": json.dumps(submission.responses),
+                            "total_score": total_score,
+                            "severity_level": severity,
+                            "recommendations": recommendations,
+                            "completed_at": completed_at,
+                        }
+                    )
+                    results[index] = {
+                        "index": index,
+                        "status": "accepted",
+                        "student_id": submission.student_id,
+                        "assessment_type": assessment_type,
+                        "total_score": total_score,
+                        "severity_level": severity,
+                        "recommendations": recommendations,
+                    }
+
+            db.execute(insert(Assessment), rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=500, detail=f"Error submitting assessments: {str(e)}"
+            )
+
+        invalidate_patient_analytics(patient_ids=[row["user_id"] for row in rows])
+
+    elapsed = time.perf_counter() - started
+    return {
+        "results": results,
+        "report": {
+            "received": len(batch.submissions),
+            "accepted": len(accepted),
+            "rejected": len(batch.submissions) - len(accepted),
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "submissions_per_second": round(len(batch.submissions) / elapsed, 1)
+            if elapsed > 0
+            else None,
+        },
+    }
+
+
 @router.get("/history/{student_id}", response_model=AssessmentHistory)
-async def get_assessment_history(student_id: str, db: Session = Depends(get_db)):
+async def get_assessment_history(
+    student_id: str,
+    limit: int = Query(20, ge=1, le=MAX_HISTORY_PAGE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
     """Get assessment history for a student"""
     # Find user by firebase_uid
     user = db.query(User).filter(User.firebase_uid == student_id).first()
@@ -172,6 +224,8 @@ async def get_assessment_history(student_id: str, db: Session = Depends(get_db))
         db.query(Assessment)
         .filter(Assessment.user_id == user.id)
         .order_by(Assessment.completed_at.desc())
+        .offset(offset)
+        .limit(limit)
         .all()
     )
 
@@ -190,99 +244,48 @@ async def get_assessment_history(student_id: str, db: Session = Depends(get_db))
             }
         )
 
-    # Get latest scores for each assessment type
-    latest_scores = {}
-    for assessment_type in ["phq9", "gad7", "ghq"]:
-        latest = (
-            db.query(Assessment)
-            .filter(
-                Assessment.user_id == user.id,
-                Assessment.assessment_type == assessment_type,
+    # Latest score per assessment type, independent of the page requested
+    ranked = (
+        db.query(
+            Assessment.assessment_type,
+            Assessment.total_score,
+            Assessment.severity_level,
+            Assessment.completed_at,
+            func.row_number()
+            .over(
+                partition_by=Assessment.assessment_type,
+                order_by=Assessment.completed_at.desc(),
             )
-            .order_by(Assessment.completed_at.desc())
-            .first()
+            .label("rank"),
         )
+        .filter(Assessment.user_id == user.id)
+        .subquery()
+    )
+    latest_rows = db.query(ranked).filter(ranked.c.rank == 1).all()
 
-        if latest:
-            latest_scores[assessment_type] = {
-                "score": latest.total_score,
-                "severity": latest.severity_level,
-                "date": latest.completed_at,
-            }
+    latest_scores = {
+        row.assessment_type: {
+            "score": row.total_score,
+            "severity": row.severity_level,
+            "date": row.completed_at,
+        }
+        for row in latest_rows
+    }
 
     return AssessmentHistory(assessments=assessments, latest_scores=latest_scores)
 
 
 @router.get("/questions/{assessment_type}")
-async def get_assessment_questions(assessment_type: str):
+async def get_assessment_questions(
+    assessment_type: str, request: Request, language: str = DEFAULT_LANGUAGE
+):
     """Get questions for a specific assessment type"""
-
-    if assessment_type == "phq9":
-        return {
-            "title": "PHQ-9 Depression Assessment",
-            "description": "Over the last 2 weeks, how often have you been bothered by any of the following problems?",
-            "scale": [
-                "Not at all",
-                "Several days",
-                "More than half the days",
-                "Nearly every day",
-            ],
-            "questions": [
-                "Little interest or pleasure in doing things",
-                "Feeling down, depressed, or hopeless",
-                "Trouble falling or staying asleep, or sleeping too much",
-                "Feeling tired or having little energy",
-                "Poor appetite or overeating",
-                "Feeling bad about yourself or that you are a failure or have let yourself or your family down",
-                "Trouble concentrating on things, such as reading the newspaper or watching television",
-                "Moving or speaking so slowly that other people could have noticed, or the opposite being so fidgety or restless that you have been moving around a lot more than usual",
-                "Thoughts that you would be better off dead, or of hurting yourself",
-            ],
-        }
-    elif assessment_type == "gad7":
-        return {
-            "title": "GAD-7 Anxiety Assessment",
-            "description": "Over the last 2 weeks, how often have you been bothered by the following problems?",
-            "scale": [
-                "Not at all",
-                "Several days",
-                "More than half the days",
-                "Nearly every day",
-            ],
-            "questions": [
-                "Feeling nervous, anxious, or on edge",
-                "Not being able to stop or control worrying",
-                "Worrying too much about different things",
-                "Trouble relaxing",
-                "Being so restless that it is hard to sit still",
-                "Becoming easily annoyed or irritable",
-                "Feeling afraid, as if something awful might happen",
-            ],
-        }
-    elif assessment_type == "ghq":
-        return {
-            "title": "GHQ-12 General Health Questionnaire",
-            "description": "Have you recently:",
-            "scale": [
-                "Better than usual",
-                "Same as usual",
-                "Less than usual",
-                "Much less than usual",
-            ],
-            "questions": [
-                "Been able to concentrate on whatever you're doing?",
-                "Lost much sleep over worry?",
-                "Felt that you were playing a useful part in things?",
-                "Felt capable of making decisions about things?",
-                "Felt constantly under strain?",
-                "Felt you couldn't overcome your difficulties?",
-                "Been able to enjoy your normal day-to-day activities?",
-                "Been able to face up to problems?",
-                "Been feeling unhappy or depressed?",
-                "Been losing confidence in yourself?",
-                "Been thinking of yourself as a worthless person?",
-                "Been feeling reasonably happy, all things considered?",
-            ],
-        }
-    else:
+    compiled = compiled_questions(assessment_type, language)
+    if compiled is None:
         raise HTTPException(status_code=404, detail="Assessment type not found")
+
+    body, etag = compiled
+    headers = {"ETag": etag, "Cache-Control": QUESTIONS_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
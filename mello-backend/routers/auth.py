@@ -1,4 +1,5 @@
 from auth import get_admin_user, get_current_user
+from counselor_directory import invalidate_counselor_directory
 from database import get_db
 from fastapi import APIRouter, Depends, HTTPException
 from models import CounselorStatus, User, UserRole
@@ -169,7 +170,7 @@ async def update_profile(
         if current_user.role == UserRole.USER:
             allowed_fields = ["name", "age", "university", "preferred_language"]
         elif current_user.role == UserRole.COUNSELOR:
-            allowed_fields = ["name", "phone_number", "address"]
+            allowed_fields = ["name", "phone_number", "address", "preferred_language"]
         else:
             allowed_fields = ["name"]
 
@@ -178,6 +179,8 @@ async def update_profile(
                 setattr(current_user, field, value)
 
         db.commit()
+        if current_user.role == UserRole.COUNSELOR:
+            invalidate_counselor_directory()
         return {"message": "Profile updated successfully"}
 
     except Exception as e:
@@ -1,9 +1,13 @@
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import Optional
 
 from auth import get_current_user
+from counselor_directory import SORTS, get_directory
 from database import get_db
+from event_bus import publish_event
 from fastapi import APIRouter, Depends, HTTPException
 from models import Booking, CounselorStatus, User, UserRole
+from patient_analytics import invalidate_patient_analytics
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -36,28 +40,33 @@ class CounselorResponse(BaseModel):
 
 
 @router.get("/counselors")
-async def get_counselors(db: Session = Depends(get_db)):
-    """Get all available counselors"""
-    counselors = (
-        db.query(User)
-        .filter(
-            User.role == UserRole.COUNSELOR,
-            User.counselor_status == CounselorStatus.APPROVED,
-        )
-        .all()
-    )
+async def get_counselors(
+    specialization: Optional[str] = None,
+    language: Optional[str] = None,
+    sort: str = "name",
+    db: Session = Depends(get_db),
+):
+    """Get approved counselors with ratings and their next open slot
+
+    Filter by specialization or language; sort by name, rating or
+    next_available.
+    """
+    if sort not in SORTS:
+        raise HTTPException(status_code=400, detail="Invalid sort")
 
+    counselors = get_directory().listing(db, specialization, language, sort)
     return [
-        {
-            "id": counselor.id,
-            "name": counselor.name,
-            "specialization": counselor.specialization,
-            "email": counselor.email,
-        }
+        {key: value for key, value in counselor.items() if key != "phone_number"}
         for counselor in counselors
     ]
 
 
+@router.get("/counselors/facets")
+async def get_counselor_facets():
+    """Get counselor counts per specialization and language"""
+    return get_directory().facet_counts()
+
+
 @router.post("/book")
 async def create_booking(
     booking: BookingCreate,
@@ -109,6 +118,20 @@ async def create_booking(
         db.add(new_booking)
         db.commit()
         db.refresh(new_booking)
+        invalidate_patient_analytics(counselor_id=new_booking.counselor_id)
+        if new_booking.urgency == "high":
+            await publish_event(
+                "urgent_booking",
+                [f"counselor:{new_booking.counselor_id}", "admins"],
+                {
+                    "booking_id": new_booking.id,
+                    "student_id": current_user.id,
+                    "student_name": current_user.name,
+                    "counselor_id": new_booking.counselor_id,
+                    "preferred_datetime": new_booking.preferred_datetime.isoformat(),
+                    "issue_description": new_booking.issue_description,
+                },
+            )
 
         return {
             "id": new_booking.id,
@@ -190,39 +213,8 @@ async def update_booking_status(
 @router.get("/counselors/{counselor_id}/available-slots")
 async def get_available_slots(counselor_id: int, db: Session = Depends(get_db)):
     """Get available time slots for a counselor"""
-    counselor = (
-        db.query(User)
-        .filter(
-            User.id == counselor_id,
-            User.role == UserRole.COUNSELOR,
-            User.counselor_status == CounselorStatus.APPROVED,
-        )
-        .first()
-    )
-
-    if not counselor:
+    directory = get_directory()
+    if counselor_id not in directory.by_id:
         raise HTTPException(status_code=404, detail="Counselor not found")
 
-    # Get existing bookings
-    existing_bookings = (
-        db.query(Booking)
-        .filter(
-            Booking.counselor_id == counselor_id,
-            Booking.status.in_(["pending", "confirmed"]),
-            Booking.preferred_datetime >= datetime.now(),
-        )
-        .all()
-    )
-
-    booked_slots = [booking.preferred_datetime for booking in existing_bookings]
-
-    # Generate available slots for next 7 days (9 AM to 5 PM)
-    available_slots = []
-    for day in range(7):
-        date = datetime.now().date() + timedelta(days=day)
-        for hour in range(9, 17):  # 9 AM to 5 PM
-            slot_time = datetime.combine(date, datetime.min.time().replace(hour=hour))
-            if slot_time not in booked_slots and slot_time > datetime.now():
-                available_slots.append(slot_time)
-
-    return {"available_slots": available_slots}
+    return {"available_slots": directory.open_slots(db, counselor_id)}
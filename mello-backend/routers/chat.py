@@ -1,86 +1,122 @@
+import asyncio
+import base64
+import hashlib
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import List, Optional
 
-import google.generativeai as genai
+from chat_pipeline import prepare_message
+from circuit_breaker import CircuitBreaker
+from conversation import conversation_store, estimate_tokens, pack_prompt
 from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from event_bus import publish_event
+from fallback_responder import fallback_response
+from fastapi import APIRouter, Depends, HTTPException, Query
+from firebase_config import safe_print
+from llm_providers import default_provider
+from log_writer import chat_log_writer
+from metrics import llm_request_duration, llm_tokens
 from models import ChatbotLog, User
+from patient_analytics import invalidate_patient_analytics
+from response_cache import chat_response_cache
 from schemas import ChatMessage, ChatResponse
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
-# Configure Gemini AI
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("gemini-1.5-flash")
+MAX_HISTORY_PAGE = 100
+# How much of an escalated message is shown in staff alerts
+ESCALATION_EXCERPT_CHARS = 280
+
+# Model calls block, so they get their own pool sized for in-flight requests
+# rather than sharing asyncio's small default executor
+llm_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHAT_LLM_MAX_CONCURRENCY", "64")),
+    thread_name_prefix="llm",
+)
+
+# System prompt for psychological support
+SYSTEM_PROMPT = """You are Mello, a supportive AI assistant for college students' mental health. 
+        Provide empathetic, helpful responses for stress, anxiety, sleep issues, and academic pressure.
+        Keep responses concise (2-3 sentences) and answer in same language of the user,be supportive, and include practical coping strategies.
+        If someone mentions severe issues like suicide, recommend seeking professional help immediately.
+        Always maintain a warm, understanding tone."""
+
+# Cached replies are keyed on this, so editing the prompt retires them
+SYSTEM_PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode()).hexdigest()[:12]
+
+
+# Deadline for a single model call; slow or failing calls trip the breaker
+LLM_TIMEOUT = float(os.getenv("CHAT_LLM_TIMEOUT", "8"))
+llm_breaker = CircuitBreaker(
+    window=int(os.getenv("CHAT_BREAKER_WINDOW", "20")),
+    failure_rate=float(os.getenv("CHAT_BREAKER_FAILURE_RATE", "0.5")),
+    slow_call_seconds=float(os.getenv("CHAT_BREAKER_SLOW_SECONDS", "4")),
+    cooldown=float(os.getenv("CHAT_BREAKER_COOLDOWN", "30")),
+)
+
+
+async def generate_reply(prompt: str, prompt_tokens=None) -> str | None:
+    """Ask the model for a reply within the deadline; None if it is unavailable"""
+    if not llm_breaker.allow():
+        return None
+
+    started = time.perf_counter()
+    outcome = "error"
+    provider_name = "unconfigured"
+    try:
+        # Gemini unless LLM_PROVIDER says otherwise; a provider that can't be
+        # built counts as a failed call, so the breaker and fallback apply
+        provider = default_provider()
+        provider_name = provider.name
+        loop = asyncio.get_running_loop()
+        text = await asyncio.wait_for(
+            loop.run_in_executor(llm_executor, provider.generate, prompt),
+            timeout=LLM_TIMEOUT,
+        )
+        outcome = "success"
+        llm_tokens.inc((provider_name, "completion"), estimate_tokens(text or ""))
+        return text
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        safe_print(f"{provider_name} call timed out")
+        return None
+    except Exception as e:
+        safe_print(f"{provider_name} call failed: {e!r}")
+        return None
+    finally:
+        elapsed = time.perf_counter() - started
+        llm_breaker.record(outcome != "success", elapsed)
+        llm_request_duration.observe((provider_name, outcome), elapsed)
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt)
+        llm_tokens.inc((provider_name, "prompt"), prompt_tokens)
 
 
 def categorize_message(message: str) -> str:
     """Categorize the user message into predefined categories"""
-    message_lower = message.lower()
-
-    if any(
-        word in message_lower
-        for word in ["stress", "stressed", "pressure", "overwhelm"]
-    ):
-        return "stress"
-    elif any(
-        word in message_lower for word in ["sleep", "insomnia", "tired", "exhausted"]
-    ):
-        return "sleep"
-    elif any(
-        word in message_lower
-        for word in ["anxiety", "anxious", "worry", "nervous", "exam"]
-    ):
-        return "anxiety"
-    elif any(word in message_lower for word in ["sad", "depressed", "lonely", "down"]):
-        return "depression"
-    else:
-        return "general"
+    return prepare_message(message).category
 
 
 def should_escalate(message: str, response: str) -> bool:
     """Determine if the conversation should be escalated to a counselor"""
-    escalation_keywords = [
-        "suicide",
-        "kill myself",
-        "end it all",
-        "not worth living",
-        "severe depression",
-        "can't cope",
-        "emergency",
-        "crisis",
-    ]
-
-    message_lower = message.lower()
-    return any(keyword in message_lower for keyword in escalation_keywords)
+    return prepare_message(message).escalate
 
 
 @router.post("/", response_model=ChatResponse)
 async def chat_with_bot(chat_message: ChatMessage, db: Session = Depends(get_db)):
     try:
-        # Create system prompt for psychological support
-        system_prompt = """You are Mello, a supportive AI assistant for college students' mental health. 
-        Provide empathetic, helpful responses for stress, anxiety, sleep issues, and academic pressure.
-        Keep responses concise (2-3 sentences) and answer in same language of the user,be supportive, and include practical coping strategies.
-        If someone mentions severe issues like suicide, recommend seeking professional help immediately.
-        Always maintain a warm, understanding tone."""
-
-        # Generate response using Gemini
-        full_prompt = f"{system_prompt}\n\nStudent: {chat_message.message}\n\nMello:"
-        response = model.generate_content(full_prompt)
-        bot_response = response.text
-
-        # Categorize the message
-        category = categorize_message(chat_message.message)
-
-        # Check if escalation is needed
-        escalate = should_escalate(chat_message.message, bot_response)
-
-        if escalate:
-            bot_response += "\n\nI'm concerned about what you're sharing. Please consider booking a session with one of our counselors who can provide professional support."
+        # Normalise, categorise and check for escalation in one pass
+        prepared = prepare_message(chat_message.message)
+        category = prepared.category
+        escalate = prepared.escalate
 
-        # Save to database if student_id is provided
+        # Resolve the student up front so their recent turns can be loaded
+        user = None
+        turns = []
         if chat_message.student_id:
             # Check if user exists, create if not
             user = (
@@ -97,48 +133,150 @@ async def chat_with_bot(chat_message: ChatMessage, db: Session = Depends(get_db)
                 db.add(user)
                 db.commit()
                 db.refresh(user)
+            conversation_key = (chat_message.student_id, chat_message.session_id)
+            turns = conversation_store.history(
+                conversation_key, db, user.id, chat_message.session_id
+            )
+
+        # Only context-free first turns are cacheable; escalations never are
+        cacheable = not escalate and not turns
+        bot_response = (
+            chat_response_cache.lookup(prepared.normalized, SYSTEM_PROMPT_VERSION)
+            if cacheable
+            else None
+        )
 
-            # Log the conversation
-            chat_log = ChatbotLog(
-                user_id=user.id,
-                message=chat_message.message,
-                response=bot_response,
-                category=category,
-                timestamp=datetime.now(timezone.utc),
+        prompt_tokens = None
+        if bot_response is None:
+            # Generate response using the configured model
+            full_prompt, prompt_tokens = pack_prompt(
+                SYSTEM_PROMPT, turns, prepared.text, message_tokens=prepared.tokens
+            )
+            bot_response = await generate_reply(full_prompt, prompt_tokens)
+            if bot_response is None:
+                # Model unavailable: answer from the curated set, don't cache it
+                bot_response = fallback_response(
+                    prepared.text, category, prepared.language
+                )
+            elif cacheable:
+                chat_response_cache.store(
+                    prepared.normalized, SYSTEM_PROMPT_VERSION, bot_response
+                )
+
+        if escalate:
+            await publish_event(
+                "escalation",
+                ["counselors", "admins"],
+                {
+                    "student_id": user.id if user is not None else None,
+                    "student_name": user.name if user is not None else None,
+                    "category": category,
+                    "message": prepared.text[:ESCALATION_EXCERPT_CHARS],
+                },
+            )
+            bot_response += "\n\nI'm concerned about what you're sharing. Please consider booking a session with one of our counselors who can provide professional support."
+
+        # Save to database if student_id is provided
+        if user is not None:
+            conversation_store.append(
+                conversation_key, chat_message.message, bot_response
             )
-            db.add(chat_log)
-            db.commit()
+
+            # Log the conversation in the background; write inline if backed up
+            chat_log = {
+                "user_id": user.id,
+                "message": chat_message.message,
+                "response": bot_response,
+                "category": category,
+                "timestamp": datetime.now(timezone.utc),
+            }
+            if not chat_log_writer.submit(chat_log):
+                db.add(ChatbotLog(**chat_log))
+                db.commit()
+                invalidate_patient_analytics(patient_ids=[user.id])
 
         return ChatResponse(
-            response=bot_response, category=category, escalate_to_counselor=escalate
+            response=bot_response,
+            category=category,
+            escalate_to_counselor=escalate,
+            category_scores=prepared.category_scores,
+            prompt_tokens=prompt_tokens,
         )
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
+        safe_print(f"Chat error: {e!r}")
+        raise HTTPException(status_code=500, detail="Error processing chat")
+
+
+def encode_history_cursor(timestamp: datetime, log_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{log_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_history_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, log_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.get("/history/{student_id}")
-async def get_chat_history(student_id: str, db: Session = Depends(get_db)):
-    """Get chat history for a student"""
-    # Find user by firebase_uid
-    user = db.query(User).filter(User.firebase_uid == student_id).first()
-    if not user:
-        return []
+async def get_chat_history(
+    student_id: str,
+    limit: int = Query(20, ge=1, le=MAX_HISTORY_PAGE),
+    before: Optional[str] = None,
+    category: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Get a page of chat history for a student, newest first
+
+    Pass the previous page's next_cursor as `before` to load older messages.
+    """
+    query = (
+        db.query(
+            ChatbotLog.id,
+            ChatbotLog.message,
+            ChatbotLog.response,
+            ChatbotLog.category,
+            ChatbotLog.timestamp,
+        )
+        .join(User, User.id == ChatbotLog.user_id)
+        .filter(User.firebase_uid == student_id)
+    )
+    if category:
+        query = query.filter(ChatbotLog.category.in_(category))
+    if before:
+        timestamp, log_id = decode_history_cursor(before)
+        query = query.filter(
+            or_(
+                ChatbotLog.timestamp < timestamp,
+                and_(ChatbotLog.timestamp == timestamp, ChatbotLog.id < log_id),
+            )
+        )
 
+    # One extra row tells us whether there is another page
     logs = (
-        db.query(ChatbotLog)
-        .filter(ChatbotLog.user_id == user.id)
-        .order_by(ChatbotLog.timestamp.desc())
-        .limit(20)
+        query.order_by(ChatbotLog.timestamp.desc(), ChatbotLog.id.desc())
+        .limit(limit + 1)
         .all()
     )
+    has_more = len(logs) > limit
+    logs = logs[:limit]
 
-    return [
-        {
-            "message": log.message,
-            "response": log.response,
-            "category": log.category,
-            "timestamp": log.timestamp,
-        }
-        for log in logs
-    ]
+    return {
+        "items": [
+            {
+                "id": log.id,
+                "message": log.message,
+                "response": log.response,
+                "category": log.category,
+                "timestamp": log.timestamp,
+            }
+            for log in logs
+        ],
+        "next_cursor": encode_history_cursor(logs[-1].timestamp, logs[-1].id)
+        if has_more
+        else None,
+    }
@@ -2,20 +2,30 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from auth import get_current_user
+from counselor_directory import SORTS, get_directory
+from counselor_ratings import rating_summary
 from database import get_db
 from fastapi import APIRouter, Depends, HTTPException, status
 from models import (
     Assessment,
     Booking,
     ChatbotLog,
+    CounselorRating,
     CounselorReport,
     Feedback,
     MoodEntry,
     User,
 )
+from patient_analytics import (
+    cached_analytics,
+    counselor_generation,
+    patient_generations,
+    store_analytics,
+)
 from pydantic import BaseModel
+from responses import FastJSONResponse
 from schemas import CounselorStatus
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, literal, null, select, union_all
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -123,69 +133,84 @@ async def get_patient_analytics(
     counselor: User = Depends(get_counselor_user), db: Session = Depends(get_db)
 ):
     """Get analytics for counselor's patients"""
-    # Get all patients who have appointments with this counselor
-    patient_ids = (
+    cached = cached_analytics(counselor.id)
+    if cached is not None:
+        return cached
+
+    # Stamps are read before the data they cover, so a write that lands
+    # mid-computation moves a stamp and this result is never served
+    generation = counselor_generation(counselor.id)
+    patient_query = (
         db.query(Booking.user_id)
         .filter(Booking.counselor_id == counselor.id)
         .distinct()
-        .subquery()
     )
-
-    # Assessment trends for counselor's patients
-    assessments = (
-        db.query(Assessment)
+    patient_list = [patient_id for (patient_id,) in patient_query]
+    patients = patient_generations(patient_list)
+    patient_ids = patient_query.scalar_subquery()
+    since = datetime.now() - timedelta(days=30)
+
+    # Severity distribution over the 100 most recent assessments
+    recent_assessments = (
+        db.query(Assessment.severity_level)
         .filter(Assessment.user_id.in_(patient_ids))
         .order_by(Assessment.completed_at.desc())
         .limit(100)
-        .all()
-    )
-
-    # Mood trends for counselor's patients
-    mood_entries = (
-        db.query(MoodEntry)
-        .filter(MoodEntry.user_id.in_(patient_ids))
-        .filter(MoodEntry.date >= datetime.now() - timedelta(days=30))
-        .all()
-    )
-
-    # Chat activity for counselor's patients
-    chat_activity = (
-        db.query(ChatbotLog.category, func.count(ChatbotLog.id).label("count"))
-        .filter(ChatbotLog.user_id.in_(patient_ids))
-        .filter(ChatbotLog.timestamp >= datetime.now() - timedelta(days=30))
-        .group_by(ChatbotLog.category)
-        .all()
+        .subquery()
     )
+    # The figures come back from one statement as (kind, key, a, b, c) rows
+    parts = [
+        select(
+            literal("severity").label("kind"),
+            recent_assessments.c.severity_level.label("key"),
+            func.count().label("a"),
+            null().label("b"),
+            null().label("c"),
+        ).group_by(recent_assessments.c.severity_level),
+        # Average mood scores over the last 30 days
+        select(
+            literal("mood"),
+            null(),
+            func.avg(MoodEntry.mood_score),
+            func.avg(MoodEntry.energy_level),
+            func.avg(MoodEntry.stress_level),
+        ).where(MoodEntry.user_id.in_(patient_ids), MoodEntry.date >= since),
+        # Chat activity for counselor's patients
+        select(
+            literal("chat"),
+            ChatbotLog.category,
+            func.count(ChatbotLog.id),
+            null(),
+            null(),
+        )
+        .where(ChatbotLog.user_id.in_(patient_ids), ChatbotLog.timestamp >= since)
+        .group_by(ChatbotLog.category),
+    ]
 
-    # Assessment severity distribution
     severity_distribution = {}
-    for assessment in assessments:
-        severity = assessment.severity_level
-        if severity not in severity_distribution:
-            severity_distribution[severity] = 0
-        severity_distribution[severity] += 1
-
-    # Average mood scores
     avg_mood = {}
-    if mood_entries:
-        total_mood = sum(entry.mood_score for entry in mood_entries)
-        total_energy = sum(entry.energy_level for entry in mood_entries)
-        total_stress = sum(entry.stress_level for entry in mood_entries)
-        count = len(mood_entries)
-
-        avg_mood = {
-            "mood": round(total_mood / count, 2),
-            "energy": round(total_energy / count, 2),
-            "stress": round(total_stress / count, 2),
-        }
+    chat_categories = {}
+    for kind, key, a, b, c in db.execute(union_all(*parts)):
+        if kind == "severity":
+            severity_distribution[key] = int(a)
+        elif kind == "mood" and a is not None:
+            avg_mood = {
+                "mood": round(float(a), 2),
+                "energy": round(float(b), 2),
+                "stress": round(float(c), 2),
+            }
+        elif kind == "chat":
+            chat_categories[key] = int(a)
 
-    return {
-        "total_patients": len(list(patient_ids)),
+    result = {
+        "total_patients": len(patient_list),
         "assessment_severity_distribution": severity_distribution,
         "average_mood_scores": avg_mood,
-        "chat_categories": {category: count for category, count in chat_activity},
-        "recent_assessments_count": len(assessments),
+        "chat_categories": chat_categories,
+        "recent_assessments_count": sum(severity_distribution.values()),
     }
+    store_analytics(counselor.id, generation, patients, result)
+    return result
 
 
 @router.get("/patients/mood-trends")
@@ -290,20 +315,22 @@ async def get_counselor_reports(
 
     reports = query.order_by(CounselorReport.session_date.desc()).all()
 
-    return [
-        {
-            "id": report.id,
-            "patient_id": report.patient_id,
-            "session_date": report.session_date,
-            "session_type": report.session_type,
-            "notes": report.notes,
-            "recommendations": report.recommendations,
-            "follow_up_required": report.follow_up_required,
-            "next_session_date": report.next_session_date,
-            "created_at": report.created_at,
-        }
-        for report in reports
-    ]
+    return FastJSONResponse(
+        [
+            {
+                "id": report.id,
+                "patient_id": report.patient_id,
+                "session_date": report.session_date,
+                "session_type": report.session_type,
+                "notes": report.notes,
+                "recommendations": report.recommendations,
+                "follow_up_required": report.follow_up_required,
+                "next_session_date": report.next_session_date,
+                "created_at": report.created_at,
+            }
+            for report in reports
+        ]
+    )
 
 
 @router.get("/feedback")
@@ -717,12 +744,7 @@ async def get_counselor_dashboard_stats(
         .count()
     )
 
-    # Average rating from feedback
-    avg_rating = (
-        db.query(func.avg(Feedback.rating))
-        .filter(Feedback.counselor_id == counselor.id)
-        .scalar()
-    )
+    avg_rating = rating_summary(db.get(CounselorRating, counselor.id))["average_rating"]
 
     return {
         "total_patients": total_patients,
@@ -735,25 +757,18 @@ async def get_counselor_dashboard_stats(
 
 
 @router.get("/list")
-async def get_counselor_list(db: Session = Depends(get_db)):
-    """Get list of approved counselors for user selection"""
-    counselors = (
-        db.query(User)
-        .filter(
-            and_(
-                User.role == "counselor",
-                User.counselor_status == CounselorStatus.APPROVED,
-            )
-        )
-        .all()
-    )
+async def get_counselor_list(
+    specialization: Optional[str] = None,
+    language: Optional[str] = None,
+    sort: str = "name",
+    db: Session = Depends(get_db),
+):
+    """Get approved counselors with their ratings for user selection"""
+    if sort not in SORTS:
+        raise HTTPException(status_code=400, detail="Invalid sort")
 
+    counselors = get_directory().listing(db, specialization, language, sort)
     return [
-        {
-            "id": counselor.id,
-            "name": counselor.name,
-            "specialization": counselor.specialization,
-            "phone_number": counselor.phone_number,
-        }
+        {key: value for key, value in counselor.items() if key != "email"}
         for counselor in counselors
     ]
@@ -1,6 +1,7 @@
 from typing import Optional
 
 from auth import get_current_user
+from counselor_ratings import record_rating
 from database import get_db
 from fastapi import APIRouter, Depends, HTTPException
 from models import Booking, Feedback, User
@@ -28,6 +29,9 @@ async def create_feedback(
     db: Session = Depends(get_db),
 ):
     """Create feedback for a counselor"""
+    if not 1 <= feedback_data.rating <= 5:
+        raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
+
     # Verify the booking exists and belongs to the user
     booking = (
         db.query(Booking)
@@ -61,7 +65,8 @@ async def create_feedback(
         counselor_id=feedback_data.counselor_id,
         booking_id=feedback_data.booking_id,
         rating=feedback_data.rating,
-        comments=feedback_data.comments,
+        feedback_text=feedback_data.comments,
+        session_date=booking.preferred_datetime,
         feedback_type=feedback_data.feedback_type,
         helpful_aspects=feedback_data.helpful_aspects,
         improvement_suggestions=feedback_data.improvement_suggestions,
@@ -69,6 +74,7 @@ async def create_feedback(
     )
 
     db.add(new_feedback)
+    record_rating(db, new_feedback)
     db.commit()
     db.refresh(new_feedback)
 
@@ -83,38 +89,31 @@ async def get_my_feedback(
     current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ):
     """Get user's submitted feedback"""
-    feedback = (
-        db.query(Feedback)
+    rows = (
+        db.query(Feedback, User.name, User.specialization)
+        .outerjoin(User, User.id == Feedback.counselor_id)
         .filter(Feedback.user_id == current_user.id)
         .order_by(Feedback.created_at.desc())
         .all()
     )
 
-    result = []
-    for fb in feedback:
-        counselor = db.query(User).filter(User.id == fb.counselor_id).first()
-        # booking = db.query(Booking).filter(Booking.id == fb.booking_id).first()
-
-        result.append(
-            {
-                "id": fb.id,
-                "counselor_name": counselor.name if counselor else "Unknown",
-                "counselor_specialization": counselor.specialization
-                if counselor
-                else None,
-                "session_date": fb.session_date,
-                "rating": fb.rating,
-                "feedback_text": fb.feedback_text,
-                "helpful_aspects": fb.helpful_aspects,
-                "improvement_suggestions": fb.improvement_suggestions,
-                "would_recommend": fb.would_recommend,
-                "feedback_type": fb.feedback_type,
-                "counselor_response": fb.counselor_response,
-                "created_at": fb.created_at,
-            }
-        )
-
-    return result
+    return [
+        {
+            "id": fb.id,
+            "counselor_name": counselor_name or "Unknown",
+            "counselor_specialization": specialization,
+            "session_date": fb.session_date,
+            "rating": fb.rating,
+            "feedback_text": fb.feedback_text,
+            "helpful_aspects": fb.helpful_aspects,
+            "improvement_suggestions": fb.improvement_suggestions,
+            "would_recommend": fb.would_recommend,
+            "feedback_type": fb.feedback_type,
+            "counselor_response": fb.counselor_response,
+            "created_at": fb.created_at,
+        }
+        for fb, counselor_name, specialization in rows
+    ]
 
 
 @router.get("/pending")
@@ -122,32 +121,28 @@ async def get_pending_feedback(
     current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ):
     """Get bookings that need feedback"""
-    # Get completed bookings without feedback
-    completed_bookings = (
-        db.query(Booking)
-        .filter(Booking.user_id == current_user.id, Booking.status == "completed")
+    # Completed bookings with no feedback row, counselor joined in
+    rows = (
+        db.query(Booking, User.name, User.specialization)
+        .outerjoin(Feedback, Feedback.booking_id == Booking.id)
+        .outerjoin(User, User.id == Booking.counselor_id)
+        .filter(
+            Booking.user_id == current_user.id,
+            Booking.status == "completed",
+            Feedback.id.is_(None),
+        )
+        .order_by(Booking.preferred_datetime)
         .all()
     )
 
-    pending_feedback = []
-    for booking in completed_bookings:
-        existing_feedback = (
-            db.query(Feedback).filter(Feedback.booking_id == booking.id).first()
-        )
-
-        if not existing_feedback:
-            counselor = db.query(User).filter(User.id == booking.counselor_id).first()
-            pending_feedback.append(
-                {
-                    "booking_id": booking.id,
-                    "counselor_id": booking.counselor_id,
-                    "counselor_name": counselor.name if counselor else "Unknown",
-                    "counselor_specialization": counselor.specialization
-                    if counselor
-                    else None,
-                    "session_date": booking.preferred_datetime,
-                    "issue_description": booking.issue_description,
-                }
-            )
-
-    return pending_feedback
+    return [
+        {
+            "booking_id": booking.id,
+            "counselor_id": booking.counselor_id,
+            "counselor_name": counselor_name or "Unknown",
+            "counselor_specialization": specialization,
+            "session_date": booking.preferred_datetime,
+            "issue_description": booking.issue_description,
+        }
+        for booking, counselor_name, specialization in rows
+    ]
@@ -2,9 +2,12 @@ from typing import Optional
 
 from auth import get_current_user
 from database import get_db
+from event_bus import publish_event
 from fastapi import APIRouter, Depends, HTTPException
 from models import ForumPost, ForumReply, User
 from pydantic import BaseModel
+from responses import FastJSONResponse
+from search_index import index_forum_post
 from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
@@ -43,22 +46,24 @@ async def get_posts(
         query.order_by(ForumPost.created_at.desc()).offset(offset).limit(limit).all()
     )
 
-    return [
-        {
-            "id": post.id,
-            "title": post.title,
-            "content": post.content,
-            "category": post.category,
-            "is_anonymous": post.is_anonymous,
-            "author_name": "Anonymous"
-            if post.is_anonymous
-            else db.query(User).filter(User.id == post.user_id).first().name,
-            "created_at": post.created_at,
-            "like_count": post.like_count,
-            "reply_count": post.reply_count,
-        }
-        for post in posts
-    ]
+    return FastJSONResponse(
+        [
+            {
+                "id": post.id,
+                "title": post.title,
+                "content": post.content,
+                "category": post.category,
+                "is_anonymous": post.is_anonymous,
+                "author_name": "Anonymous"
+                if post.is_anonymous
+                else db.query(User).filter(User.id == post.user_id).first().name,
+                "created_at": post.created_at,
+                "like_count": post.like_count,
+                "reply_count": post.reply_count,
+            }
+            for post in posts
+        ]
+    )
 
 
 @router.post("/posts")
@@ -81,6 +86,7 @@ async def create_post(
     db.add(new_post)
     db.commit()
     db.refresh(new_post)
+    index_forum_post(new_post)
 
     return {"message": "Post created successfully", "post_id": new_post.id}
 
@@ -213,6 +219,16 @@ async def flag_post(
     post.is_flagged = True
     post.flagged_reason = reason
     db.commit()
+    await publish_event(
+        "flagged_post",
+        ["admins"],
+        {
+            "post_id": post.id,
+            "title": post.title,
+            "reason": reason,
+            "flagged_by": current_user.id,
+        },
+    )
 
     return {"message": "Post flagged for moderation"}
 
@@ -5,7 +5,9 @@ from auth import get_current_user
 from database import get_db
 from fastapi import APIRouter, Depends, HTTPException
 from models import MoodEntry, User
+from patient_analytics import invalidate_patient_analytics
 from pydantic import BaseModel
+from responses import FastJSONResponse
 from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
 
@@ -66,6 +68,7 @@ async def create_mood_entry(
     db.add(new_entry)
     db.commit()
     db.refresh(new_entry)
+    invalidate_patient_analytics(patient_ids=[current_user.id])
 
     return {"message": "Mood entry created successfully", "entry_id": new_entry.id}
 
@@ -88,18 +91,20 @@ async def get_mood_entries(
         .all()
     )
 
-    return [
-        {
-            "id": entry.id,
-            "date": entry.date.strftime("%Y-%m-%d"),
-            "mood_score": entry.mood_score,
-            "energy_level": entry.energy_level,
-            "stress_level": entry.stress_level,
-            "sleep_hours": entry.sleep_hours,
-            "notes": entry.notes,
-        }
-        for entry in entries
-    ]
+    return FastJSONResponse(
+        [
+            {
+                "id": entry.id,
+                "date": entry.date.strftime("%Y-%m-%d"),
+                "mood_score": entry.mood_score,
+                "energy_level": entry.energy_level,
+                "stress_level": entry.stress_level,
+                "sleep_hours": entry.sleep_hours,
+                "notes": entry.notes,
+            }
+            for entry in entries
+        ]
+    )
 
 
 @router.get("/today")
@@ -164,6 +169,7 @@ async def update_mood_entry(
         entry.notes = mood_data.notes
 
     db.commit()
+    invalidate_patient_analytics(patient_ids=[current_user.id])
     return {"message": "Mood entry updated successfully"}
 
 
@@ -250,4 +256,5 @@ async def delete_mood_entry(
 
     db.delete(entry)
     db.commit()
+    invalidate_patient_analytics(patient_ids=[current_user.id])
     return {"message": "Mood entry deleted successfully"}
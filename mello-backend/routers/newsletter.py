@@ -2,69 +2,73 @@ from datetime import datetime
 
 from auth import get_current_user
 from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from http_cache import NEWSLETTERS, content_etag, etag_matches, not_modified
 from models import Newsletter, User
+from newsletter_feed import published_feed
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
+MAX_FEED_PAGE = 100
+
+# Signed-in users only, so browsers may cache but must revalidate
+NEWSLETTERS_CACHE_CONTROL = "private, no-cache"
+
 
 @router.get("/")
 async def get_published_newsletters(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     limit: int = 20,
     offset: int = 0,
 ):
-    """Get published newsletters for users"""
-    newsletters = (
-        db.query(Newsletter)
-        .filter(Newsletter.is_published)
-        .order_by(Newsletter.published_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+    """Get summaries of published newsletters; open one by ID for its content"""
+    etag = content_etag(db, NEWSLETTERS)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, NEWSLETTERS_CACHE_CONTROL)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = NEWSLETTERS_CACHE_CONTROL
 
-    return [
-        {
-            "id": newsletter.id,
-            "title": newsletter.title,
-            "content": newsletter.content,
-            "published_at": newsletter.published_at,
-            "author_name": db.query(User)
-            .filter(User.id == newsletter.author_id)
-            .first()
-            .name,
-        }
-        for newsletter in newsletters
-    ]
+    limit = max(1, min(limit, MAX_FEED_PAGE))
+    offset = max(0, offset)
+    return published_feed(db, etag, limit, offset)
 
 
 @router.get("/{newsletter_id}")
 async def get_newsletter_by_id(
     newsletter_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Get a specific newsletter by ID"""
-    newsletter = (
-        db.query(Newsletter)
+    etag = content_etag(db, NEWSLETTERS)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, NEWSLETTERS_CACHE_CONTROL)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = NEWSLETTERS_CACHE_CONTROL
+
+    row = (
+        db.query(Newsletter, User.name)
+        .outerjoin(User, User.id == Newsletter.author_id)
         .filter(Newsletter.id == newsletter_id, Newsletter.is_published)
         .first()
     )
 
-    if not newsletter:
+    if not row:
         raise HTTPException(status_code=404, detail="Newsletter not found")
 
-    author = db.query(User).filter(User.id == newsletter.author_id).first()
-
+    newsletter, author_name = row
     return {
         "id": newsletter.id,
         "title": newsletter.title,
         "content": newsletter.content,
         "published_at": newsletter.published_at,
-        "author_name": author.name if author else "Unknown",
+        "author_name": author_name or "Unknown",
     }
 
 
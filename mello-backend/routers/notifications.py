@@ -0,0 +1,58 @@
+import json
+import os
+
+from auth import StreamUser, get_stream_user
+from event_bus import broker
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from models import UserRole
+
+router = APIRouter()
+
+# Comment lines keep idle connections open through proxies
+HEARTBEAT_SECONDS = float(os.getenv("NOTIFY_HEARTBEAT_SECONDS", "15"))
+
+
+def staff_channels(user: StreamUser):
+    """Notification channels a user may listen to"""
+    if user.role == UserRole.ADMIN:
+        return ["admins"]
+    if user.role == UserRole.COUNSELOR:
+        return ["counselors", f"counselor:{user.id}"]
+    return []
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request, current_user: StreamUser = Depends(get_stream_user)
+):
+    """Server-sent event stream of escalations, urgent bookings and flagged posts"""
+    channels = staff_channels(current_user)
+    if not channels:
+        raise HTTPException(
+            status_code=403, detail="Counselor or admin access required"
+        )
+
+    subscription = broker.subscribe(channels)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                yield (
+                    f"id: {event['id']}\n"
+                    f"event: {event['type']}\n"
+                    f"data: {json.dumps(event)}\n\n"
+                )
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,46 +1,59 @@
 from typing import List, Optional
 
-from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
-from models import Resource
+from fastapi import APIRouter, HTTPException, Request
+from http_cache import etag_matches, not_modified
+from resource_catalogue import get_catalogue
+from responses import FastJSONResponse
 from schemas import ResourceResponse
-from sqlalchemy.orm import Session
 
 router = APIRouter()
 
+# Public catalogue: cacheable anywhere, but revalidated on every use
+RESOURCES_CACHE_CONTROL = "public, no-cache"
+
+
+def catalogue_response(request: Request, catalogue, content):
+    """Rows from the in-memory catalogue, or 304 if the client is current"""
+    if etag_matches(request.headers.get("if-none-match"), catalogue.etag):
+        return not_modified(catalogue.etag, RESOURCES_CACHE_CONTROL)
+    return FastJSONResponse(
+        content() if callable(content) else content,
+        headers={"ETag": catalogue.etag, "Cache-Control": RESOURCES_CACHE_CONTROL},
+    )
+
 
 @router.get("/resources", response_model=List[ResourceResponse])
 async def get_resources(
+    request: Request,
     category: Optional[str] = None,
     language: Optional[str] = None,
     resource_type: Optional[str] = None,
-    db: Session = Depends(get_db),
 ):
     """Get psychoeducational resources with optional filtering"""
-    query = db.query(Resource)
-
-    if category:
-        query = query.filter(Resource.category == category)
-    if language:
-        query = query.filter(Resource.language == language)
-    if resource_type:
-        query = query.filter(Resource.type == resource_type)
-
-    resources = query.all()
-    return resources
+    catalogue = get_catalogue()
+    return catalogue_response(
+        request,
+        catalogue,
+        lambda: catalogue.filter(
+            category=category, language=language, type=resource_type
+        ),
+    )
 
 
 @router.get("/resources/categories")
-async def get_resource_categories(db: Session = Depends(get_db)):
+async def get_resource_categories(request: Request):
     """Get all available resource categories"""
-    categories = db.query(Resource.category).distinct().all()
-    return {"categories": [cat[0] for cat in categories]}
+    catalogue = get_catalogue()
+    return catalogue_response(
+        request, catalogue, lambda: {"categories": catalogue.categories}
+    )
 
 
 @router.get("/resources/{resource_id}", response_model=ResourceResponse)
-async def get_resource(resource_id: int, db: Session = Depends(get_db)):
+async def get_resource(resource_id: int, request: Request):
     """Get a specific resource by ID"""
-    resource = db.query(Resource).filter(Resource.id == resource_id).first()
+    catalogue = get_catalogue()
+    resource = catalogue.by_id.get(resource_id)
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
-    return resource
+    return catalogue_response(request, catalogue, resource)
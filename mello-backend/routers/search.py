@@ -0,0 +1,29 @@
+import time
+from typing import List, Optional
+
+from auth import get_current_user
+from fastapi import APIRouter, Depends, Query
+from models import User
+from search_index import search
+
+router = APIRouter()
+
+MAX_RESULTS = 50
+
+
+@router.get("/")
+async def search_content(
+    q: str,
+    types: Optional[List[str]] = Query(None),
+    limit: int = 20,
+    current_user: User = Depends(get_current_user),
+):
+    """Search resources, newsletters and forum posts, best matches first"""
+    limit = max(1, min(limit, MAX_RESULTS))
+    started = time.perf_counter()
+    results = search(q, types, limit)
+    return {
+        "query": q,
+        "results": results,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
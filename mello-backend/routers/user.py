@@ -2,8 +2,9 @@ from datetime import date, datetime, timedelta
 from typing import Optional
 
 from auth import get_current_user
+from counselor_ratings import record_rating
 from database import get_db
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from models import (
     Assessment,
     Booking,
@@ -13,6 +14,7 @@ from models import (
     Newsletter,
     User,
 )
+from patient_analytics import invalidate_patient_analytics
 from pydantic import BaseModel
 from sqlalchemy import and_, desc, func
 from sqlalchemy.orm import Session
@@ -62,6 +64,7 @@ async def create_mood_entry(
         existing_entry.sleep_hours = mood_data.sleep_hours
         existing_entry.notes = mood_data.notes
         db.commit()
+        invalidate_patient_analytics(patient_ids=[current_user.id])
         return {"message": "Mood entry updated for today"}
     else:
         # Create new entry
@@ -77,6 +80,7 @@ async def create_mood_entry(
         db.add(new_entry)
         db.commit()
         db.refresh(new_entry)
+        invalidate_patient_analytics(patient_ids=[current_user.id])
         return {"message": "Mood entry created successfully", "entry_id": new_entry.id}
 
 
@@ -192,15 +196,20 @@ async def submit_feedback(
     db: Session = Depends(get_db),
 ):
     """Submit feedback"""
+    if not 1 <= feedback_data.rating <= 5:
+        raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
+
     new_feedback = Feedback(
         user_id=current_user.id,
         feedback_type=feedback_data.feedback_type,
         rating=feedback_data.rating,
-        comments=feedback_data.comments,
+        feedback_text=feedback_data.comments,
         counselor_id=feedback_data.counselor_id,
     )
 
     db.add(new_feedback)
+    if feedback_data.counselor_id is not None:
+        record_rating(db, new_feedback)
     db.commit()
     db.refresh(new_feedback)
 
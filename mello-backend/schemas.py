@@ -15,12 +15,15 @@ class CounselorStatus(str, Enum):
 class ChatMessage(BaseModel):
     message: str
     student_id: Optional[str] = None
+    session_id: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
     response: str
     category: str
     escalate_to_counselor: bool = False
+    category_scores: dict = {}
+    prompt_tokens: Optional[int] = None
 
 
 # User schemas
@@ -125,6 +128,10 @@ class AssessmentSubmission(BaseModel):
     responses: List[int]
 
 
+class AssessmentBatchSubmission(BaseModel):
+    submissions: List[AssessmentSubmission]
+
+
 class AssessmentResponse(BaseModel):
     id: int
     student_id: str
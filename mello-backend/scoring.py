@@ -0,0 +1,79 @@
+"""
+Table-driven scoring for the questionnaires defined in ``questionnaires.py``.
+
+Each instrument is compiled once into per-question point tables and a
+score-to-band table, so scoring a submission is one lookup per answer plus
+one lookup for the band, with no branching on the assessment type.
+"""
+
+from operator import getitem
+
+from questionnaires import DEFAULT_LANGUAGE, QUESTIONNAIRES
+
+
+class Scorer:
+    """Precompiled scoring tables for a single questionnaire"""
+
+    def __init__(self, assessment_type: str, definition: dict):
+        self.assessment_type = assessment_type
+        self.name = definition["name"]
+        self.version = definition["version"]
+        self.low, self.high = definition["response_range"]
+        self.item_count = len(definition["text"][DEFAULT_LANGUAGE]["questions"])
+
+        values = definition.get("item_values", range(self.low, self.high + 1))
+        weights = definition.get("item_weights", [1] * self.item_count)
+        reverse_items = set(definition.get("reverse_items", ()))
+
+        # points[item][answer]: answers below self.low are rejected by validate()
+        self.points = []
+        for item in range(self.item_count):
+            row = [0] * (self.high + 1)
+            for answer in range(self.low, self.high + 1):
+                index = (
+                    self.high - answer if item in reverse_items else answer - self.low
+                )
+                row[answer] = weights[item] * values[index]
+            self.points.append(tuple(row))
+
+        # band_for_score[total] -> (severity, recommendations)
+        self.max_score = sum(max(row) for row in self.points)
+        bands = definition["bands"]
+        self.band_for_score = []
+        band = 0
+        for total in range(self.max_score + 1):
+            while band < len(bands) - 1 and total > bands[band][0]:
+                band += 1
+            self.band_for_score.append((bands[band][1], bands[band][2]))
+
+    def validate(self, responses) -> str | None:
+        """Return an error message if responses don't fit the questionnaire"""
+        if len(responses) != self.item_count:
+            return f"{self.name} requires exactly {self.item_count} responses"
+        if min(responses) < self.low or max(responses) > self.high:
+            return f"{self.name} responses must be between {self.low} and {self.high}"
+        return None
+
+    def score(self, responses):
+        """Return (total_score, severity, recommendations) for valid responses"""
+        total_score = sum(map(getitem, self.points, responses))
+        severity, recommendations = self.band_for_score[total_score]
+        return total_score, severity, recommendations
+
+    def score_many(self, batch):
+        """Score a batch of valid response lists, one result tuple per entry"""
+        points = self.points
+        band_for_score = self.band_for_score
+        totals = [sum(map(getitem, points, responses)) for responses in batch]
+        return [(total, *band_for_score[total]) for total in totals]
+
+
+SCORERS = {
+    assessment_type: Scorer(assessment_type, definition)
+    for assessment_type, definition in QUESTIONNAIRES.items()
+}
+
+
+def get_scorer(assessment_type: str) -> Scorer | None:
+    """Return the compiled scorer for an assessment type, if registered"""
+    return SCORERS.get(assessment_type)
@@ -0,0 +1,300 @@
+"""
+Full-text search over resources, newsletters and forum posts.
+
+Documents live in a SQLite FTS5 index on local disk (``SEARCH_INDEX_PATH``,
+default in the temp directory) that every worker on the host shares.
+Text is tokenised here rather than by SQLite so English and Hindi get the
+same treatment in documents and queries: NFC-normalised and casefolded,
+split on anything that isn't a letter, digit or Devanagari sign, stripped
+of stop words and lightly stemmed. FTS5 then ranks matches with BM25,
+weighting titles above bodies.
+
+Write endpoints call the ``index_*`` helpers after committing, so the
+index follows the database incrementally. It is rebuilt from the database
+when empty or when ``SCHEMA_VERSION`` changes; ``python search_index.py``
+forces a rebuild.
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+
+from firebase_config import safe_print
+from models import ForumPost, Newsletter, Resource
+from newsletter_feed import plain_excerpt
+
+INDEX_PATH = os.getenv(
+    "SEARCH_INDEX_PATH", os.path.join(tempfile.gettempdir(), "mello-search.sqlite3")
+)
+# Bump when tokenisation or what is stored changes to force a rebuild
+SCHEMA_VERSION = 3
+
+# Document types and the code folded into FTS rowids
+DOC_TYPES = {"resource": 1, "newsletter": 2, "forum_post": 3}
+
+# Word characters plus Devanagari vowel signs and viramas, minus the dandas
+_TOKEN = re.compile(r"[\wऀ-ॣ०-ॿ]+")
+
+EN_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i if in into is it its "
+    "me my of on or so that the their them they this to was we what when where "
+    "which who why will with you your".split()
+)
+HI_STOPWORDS = frozenset(
+    "और का की के को है हैं था थी थे में से पर यह वह ये वो एक भी तो ही कि जो "
+    "कर करें ने हम मैं आप".split()
+)
+# Common Hindi inflections, longest first
+HI_SUFFIXES = ("ियों", "ियाँ", "ियां", "ाओं", "ाएं", "ाएँ", "ों", "ें", "ाँ", "ां")
+# Final vowel signs, dropped from uninflected words so "परीक्षा" and
+# "परीक्षाओं" both reduce to "परीक्ष"
+HI_FINAL_VOWELS = frozenset("ािीुूेैोौ")
+
+
+def _stem(token: str) -> str:
+    if token.isascii():
+        if len(token) > 4 and token.endswith("ies"):
+            return token[:-3] + "y"
+        if len(token) > 5 and token.endswith("ing"):
+            return token[:-3]
+        if len(token) > 4 and token.endswith("ed"):
+            return token[:-2]
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            return token[:-1]
+        return token
+    for suffix in HI_SUFFIXES:
+        if token.endswith(suffix) and len(token) > len(suffix) + 1:
+            return token[: -len(suffix)]
+    if len(token) > 2 and token[-1] in HI_FINAL_VOWELS:
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list:
+    """Search terms for a piece of English and/or Hindi text"""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFC", text).casefold()
+    return [
+        _stem(token)
+        for token in _TOKEN.findall(folded)
+        if token not in EN_STOPWORDS and token not in HI_STOPWORDS
+    ]
+
+
+_local = threading.local()
+
+
+def _connection() -> sqlite3.Connection:
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = sqlite3.connect(INDEX_PATH, timeout=5, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # The ascii tokenizer splits only on ASCII separators; terms arrive
+        # pre-tokenised and space-separated, Devanagari included
+        connection.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5("
+            "title, body, doc_type UNINDEXED, doc_id UNINDEXED, "
+            "display_title UNINDEXED, excerpt UNINDEXED, category UNINDEXED, "
+            "tokenize='ascii')"
+        )
+        _local.connection = connection
+    return connection
+
+
+def _rowid(doc_type: str, doc_id: int) -> int:
+    return doc_id * 8 + DOC_TYPES[doc_type]
+
+
+def _document(doc_type: str, doc_id: int, title: str, body: str, category):
+    return (
+        _rowid(doc_type, doc_id),
+        " ".join(tokenize(title)),
+        # The category is searchable too, but not shown in the excerpt
+        " ".join(tokenize(f"{body or ''} {category or ''}")),
+        doc_type,
+        doc_id,
+        title,
+        plain_excerpt(body),
+        category,
+    )
+
+
+def _resource_document(resource: Resource):
+    return _document(
+        "resource", resource.id, resource.title, resource.description, resource.category
+    )
+
+
+def _newsletter_document(newsletter: Newsletter):
+    return _document(
+        "newsletter", newsletter.id, newsletter.title, newsletter.content, None
+    )
+
+
+def _forum_post_document(post: ForumPost):
+    return _document("forum_post", post.id, post.title, post.content, post.category)
+
+
+def _forum_post_visible(post: ForumPost) -> bool:
+    # Mirrors forum.get_posts: moderated and not removed
+    return bool(post.is_moderated) and post.moderation_action not in (None, "removed")
+
+
+@contextmanager
+def _transaction():
+    connection = _connection()
+    # IMMEDIATE takes the write lock up front so workers queue, not deadlock
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+INSERT_DOCUMENT = (
+    "INSERT INTO documents (rowid, title, body, doc_type, doc_id, "
+    "display_title, excerpt, category) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _write(doc_type: str, doc_id: int, document=None):
+    with _transaction() as connection:
+        connection.execute(
+            "DELETE FROM documents WHERE rowid = ?", (_rowid(doc_type, doc_id),)
+        )
+        if document is not None:
+            connection.execute(INSERT_DOCUMENT, document)
+
+
+def _safely(action, doc_type: str, doc_id: int):
+    # Search must never fail the write that triggered it
+    try:
+        action()
+    except Exception as e:
+        safe_print(f"Failed to index {doc_type} {doc_id}: {e!r}")
+
+
+def index_resource(resource: Resource):
+    _safely(
+        lambda: _write("resource", resource.id, _resource_document(resource)),
+        "resource",
+        resource.id,
+    )
+
+
+def index_newsletter(newsletter: Newsletter):
+    """Index a published newsletter, or drop an unpublished one"""
+    document = _newsletter_document(newsletter) if newsletter.is_published else None
+    _safely(
+        lambda: _write("newsletter", newsletter.id, document),
+        "newsletter",
+        newsletter.id,
+    )
+
+
+def index_forum_post(post: ForumPost):
+    """Index a visible forum post, or drop a hidden or removed one"""
+    document = _forum_post_document(post) if _forum_post_visible(post) else None
+    _safely(lambda: _write("forum_post", post.id, document), "forum_post", post.id)
+
+
+def rebuild_search_index(db) -> int:
+    """Replace the whole index with the current database contents"""
+    documents = [_resource_document(resource) for resource in db.query(Resource)]
+    documents += [
+        _newsletter_document(newsletter)
+        for newsletter in db.query(Newsletter).filter(Newsletter.is_published)
+    ]
+    documents += [
+        _forum_post_document(post)
+        for post in db.query(ForumPost).filter(ForumPost.is_moderated)
+        if _forum_post_visible(post)
+    ]
+
+    with _transaction() as connection:
+        connection.execute("DELETE FROM documents")
+        connection.executemany(INSERT_DOCUMENT, documents)
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return len(documents)
+
+
+def ensure_search_index(db) -> bool:
+    """Rebuild the index if it is empty or was built by another schema version"""
+    connection = _connection()
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    populated = connection.execute("SELECT 1 FROM documents LIMIT 1").fetchone()
+    if version == SCHEMA_VERSION and populated:
+        return False
+    rebuild_search_index(db)
+    return True
+
+
+def _match_expression(terms, any_term: bool) -> str:
+    quoted = [f'"{term}"' for term in terms]
+    # Treat the last word as a prefix so partial input still matches
+    quoted[-1] += "*"
+    return (" OR " if any_term else " ").join(quoted)
+
+
+def search(query: str, doc_types=None, limit: int = 20):
+    """Ranked matches for a query; all terms must match, else any of them"""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    doc_types = [t for t in (doc_types or DOC_TYPES) if t in DOC_TYPES]
+    if not doc_types:
+        return []
+
+    placeholders = ", ".join("?" for _ in doc_types)
+    sql = (
+        "SELECT doc_type, doc_id, display_title, excerpt, category, "
+        "bm25(documents, 3.0, 1.0) AS rank FROM documents "
+        f"WHERE documents MATCH ? AND doc_type IN ({placeholders}) "
+        "ORDER BY rank LIMIT ?"
+    )
+    rows = []
+    try:
+        connection = _connection()
+        for any_term in (False, True):
+            if any_term and len(terms) == 1:
+                break
+            expression = _match_expression(terms, any_term)
+            rows = connection.execute(sql, (expression, *doc_types, limit)).fetchall()
+            if rows:
+                break
+    except sqlite3.Error as e:
+        # A missing or locked index means no results, not a failed request
+        safe_print(f"Search failed for {query!r}: {e!r}")
+        return []
+    return [
+        {
+            "type": doc_type,
+            "id": doc_id,
+            "title": title,
+            "excerpt": excerpt,
+            "category": category,
+            "score": round(-rank, 4),
+        }
+        for doc_type, doc_id, title, excerpt, category, rank in rows
+    ]
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        count = rebuild_search_index(db)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    print(f"Indexed {count} documents into {INDEX_PATH} in {elapsed:.2f}s")
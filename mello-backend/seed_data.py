@@ -1,7 +1,10 @@
 import json
 from datetime import datetime, timedelta
 
+from counselor_directory import invalidate_counselor_directory
+from counselor_ratings import rebuild_counselor_ratings
 from database import SessionLocal, engine
+from http_cache import NEWSLETTERS, bump_content_version
 from models import (
     Assessment,
     Base,
@@ -18,6 +21,7 @@ from models import (
     User,
     UserRole,
 )
+from resource_catalogue import invalidate_resource_catalogue
 
 
 def create_seed_data():
@@ -404,6 +408,7 @@ def create_seed_data():
 
         for newsletter in newsletters:
             db.add(newsletter)
+        bump_content_version(db, NEWSLETTERS)
 
         # Create sample mood entries
         mood_entries = [
@@ -551,6 +556,9 @@ def create_seed_data():
             db.add(reply)
 
         db.commit()
+        invalidate_resource_catalogue()
+        rebuild_counselor_ratings(db)
+        invalidate_counselor_directory()
         print("Seed data created successfully!")
 
     except Exception as e:
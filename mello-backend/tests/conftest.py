@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Modules live at the top level of mello-backend; tests run against a
+# throwaway SQLite database instead of the MySQL one in DATABASE_URL
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="mello-tests-"), "mello.db"
+)
+
+
+@pytest.fixture
+def db():
+    """Session on freshly created tables, dropped afterwards"""
+    from database import SessionLocal, engine
+    from models import Base
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
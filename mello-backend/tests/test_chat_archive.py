@@ -0,0 +1,53 @@
+from datetime import date, datetime
+
+from chat_archive import chat_counts, refresh_rollups
+from models import ChatbotLog, ChatDailyRollup
+
+
+def add_log(db, timestamp, category="stress"):
+    db.add(
+        ChatbotLog(
+            user_id=1,
+            message="hi",
+            response="hello",
+            category=category,
+            timestamp=timestamp,
+        )
+    )
+    db.commit()
+
+
+def rollups(db):
+    return {
+        (row.day, row.category): row.count for row in db.query(ChatDailyRollup).all()
+    }
+
+
+def test_late_rows_for_rolled_up_day_are_counted(db):
+    add_log(db, datetime(2026, 3, 1, 10))
+    refresh_rollups(db, today=date(2026, 3, 2))
+    assert rollups(db) == {(date(2026, 3, 1), "stress"): 1}
+
+    # Lands after the day was rolled up, e.g. from a replayed dead letter
+    add_log(db, datetime(2026, 3, 1, 23, 30))
+    add_log(db, datetime(2026, 3, 2, 9), category="general")
+    refresh_rollups(db, today=date(2026, 3, 3))
+
+    assert rollups(db) == {
+        (date(2026, 3, 1), "stress"): 2,
+        (date(2026, 3, 2), "general"): 1,
+    }
+    assert chat_counts(db, date(2026, 3, 1)) == {
+        ("2026-03-01", "stress"): 2,
+        ("2026-03-02", "general"): 1,
+    }
+
+
+def test_days_outside_refresh_window_are_left_alone(db):
+    add_log(db, datetime(2026, 3, 1, 10))
+    refresh_rollups(db, today=date(2026, 3, 2))
+    add_log(db, datetime(2026, 3, 1, 11))
+
+    refresh_rollups(db, today=date(2026, 3, 20), refresh_days=7)
+
+    assert rollups(db) == {(date(2026, 3, 1), "stress"): 1}
@@ -0,0 +1,52 @@
+import json
+
+import chat_lexicon
+import pytest
+
+
+@pytest.fixture
+def lexicon_at(monkeypatch):
+    def point_at(path):
+        monkeypatch.setattr(chat_lexicon, "LEXICON_PATH", str(path))
+        monkeypatch.setattr(chat_lexicon, "_lexicon", None)
+        monkeypatch.setattr(chat_lexicon, "_loaded_mtime", None)
+        monkeypatch.setattr(chat_lexicon, "_last_check", 0.0)
+
+    return point_at
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        None,
+        "{not json",
+        json.dumps({"categories": {}}),
+        json.dumps({"categories": {}, "escalation": {"en": []}}),
+    ],
+    ids=["missing", "invalid", "no-escalation", "empty-escalation"],
+)
+def test_escalation_survives_a_bad_lexicon(lexicon_at, tmp_path, contents):
+    path = tmp_path / "lexicon.json"
+    if contents is not None:
+        write(path, contents)
+    lexicon_at(path)
+
+    _, _, escalate = chat_lexicon.classify_message("I keep thinking about suicide")
+    assert escalate
+
+
+def test_file_escalation_terms_are_added_to_the_builtin_ones(lexicon_at, tmp_path):
+    lexicon_at(
+        write(
+            tmp_path / "lexicon.json",
+            json.dumps({"categories": {}, "escalation": {"en": ["self harm"]}}),
+        )
+    )
+
+    assert chat_lexicon.classify_message("thoughts of self harm")[2]
+    assert chat_lexicon.classify_message("this is a crisis")[2]
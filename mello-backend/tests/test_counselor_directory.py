@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from counselor_directory import CounselorDirectory
+from counselor_ratings import record_rating
+from models import Booking, CounselorStatus, Feedback, User, UserRole
+
+NOW = datetime(2026, 3, 2, 8, 30)
+
+
+def make_counselor(db):
+    counselor = User(
+        firebase_uid="counselor",
+        email="counselor@example.com",
+        name="Dr. Rao",
+        role=UserRole.COUNSELOR,
+        counselor_status=CounselorStatus.APPROVED,
+        age=40,
+        university="",
+        specialization="Anxiety, Stress",
+        license_number="",
+        phone_number="",
+        address="",
+    )
+    db.add(counselor)
+    db.commit()
+    return counselor
+
+
+def test_bookings_and_ratings_show_without_a_rebuild(db):
+    counselor = make_counselor(db)
+    directory = CounselorDirectory([counselor], "1")
+
+    [item] = directory.listing(db, specialization="stress", now=NOW)
+    assert item["next_available_slot"] == datetime(2026, 3, 2, 9)
+    assert item["rating_count"] == 0
+
+    db.add(
+        Booking(
+            user_id=1,
+            counselor_id=counselor.id,
+            preferred_datetime=datetime(2026, 3, 2, 9),
+            status="confirmed",
+            issue_description="",
+            notes="",
+        )
+    )
+    feedback = Feedback(
+        user_id=1,
+        counselor_id=counselor.id,
+        session_date=datetime(2026, 3, 1),
+        feedback_type="counselor",
+        rating=4,
+        feedback_text="",
+        helpful_aspects="",
+        improvement_suggestions="",
+        counselor_response="",
+    )
+    db.add(feedback)
+    record_rating(db, feedback)
+    db.commit()
+
+    # Same snapshot: only the profiles are cached
+    [item] = directory.listing(db, specialization="stress", now=NOW)
+    assert item["next_available_slot"] == datetime(2026, 3, 2, 10)
+    assert item["rating_count"] == 1
+    assert item["average_rating"] == 4
+    assert datetime(2026, 3, 2, 9) not in directory.open_slots(db, counselor.id, NOW)
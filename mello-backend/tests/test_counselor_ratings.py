@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from counselor_ratings import rebuild_counselor_ratings, record_rating
+from models import CounselorRating, Feedback
+
+
+def add_feedback(db, rating, would_recommend):
+    feedback = Feedback(
+        user_id=1,
+        counselor_id=7,
+        session_date=datetime(2026, 1, 1),
+        feedback_type="counselor",
+        rating=rating,
+        would_recommend=would_recommend,
+        feedback_text="",
+        helpful_aspects="",
+        improvement_suggestions="",
+        counselor_response="",
+    )
+    db.add(feedback)
+    record_rating(db, feedback)
+    db.commit()
+
+
+def totals(db):
+    row = db.get(CounselorRating, 7)
+    db.expire(row)
+    return [getattr(row, column.key) for column in CounselorRating.__table__.columns]
+
+
+def test_running_totals_match_a_rebuild(db):
+    add_feedback(db, 5, True)
+    add_feedback(db, 3, None)
+    add_feedback(db, 5, False)
+    live = totals(db)
+
+    rebuild_counselor_ratings(db)
+    assert totals(db) == live
+    # would_recommend=None falls back to the column default, True
+    assert live == [7, 3, 13, 0, 0, 1, 0, 2, 2, 3]
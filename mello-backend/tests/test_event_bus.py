@@ -0,0 +1,75 @@
+import json
+import sys
+import threading
+import types
+
+import event_bus
+
+
+class FakeConnectionError(Exception):
+    pass
+
+
+class FakePubSub:
+    def __init__(self, messages, error=None):
+        self.messages = messages
+        self.error = error
+        self.subscribed = []
+        self.closed = False
+
+    def subscribe(self, channel):
+        self.subscribed.append(channel)
+
+    def listen(self):
+        yield from self.messages
+        if self.error is not None:
+            raise self.error
+        # Stay connected for the rest of the test
+        threading.Event().wait()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self, pubsubs):
+        self.pubsubs = pubsubs
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self.pubsubs.pop(0)
+
+
+def message(event):
+    payload = {"channels": ["admins"], "event": event}
+    return {"type": "message", "data": json.dumps(payload)}
+
+
+def test_listener_resubscribes_after_dropped_connection(monkeypatch):
+    dropped = FakePubSub(
+        [message({"id": "a"})], error=FakeConnectionError("connection reset")
+    )
+    recovered = FakePubSub([message({"id": "b"})])
+    client = FakeRedis([dropped, recovered])
+    fake_redis = types.SimpleNamespace(
+        Redis=types.SimpleNamespace(from_url=lambda url: client),
+        ConnectionError=FakeConnectionError,
+        TimeoutError=TimeoutError,
+    )
+    monkeypatch.setitem(sys.modules, "redis", fake_redis)
+    monkeypatch.setattr(event_bus, "REDIS_RETRY_MIN_DELAY", 0)
+
+    delivered = []
+    done = threading.Event()
+
+    def deliver(self, channels, event):
+        delivered.append(event["id"])
+        if len(delivered) == 2:
+            done.set()
+
+    monkeypatch.setattr(event_bus.RedisBroker, "deliver", deliver)
+    event_bus.RedisBroker("redis://test")
+
+    assert done.wait(5)
+    assert delivered == ["a", "b"]
+    assert dropped.closed
+    assert recovered.subscribed == [event_bus.REDIS_CHANNEL]
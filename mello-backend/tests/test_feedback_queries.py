@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from database import engine
+from models import Booking, Feedback, User, UserRole
+from query_stats import instrument_engine, track_queries
+from routers.feedback import get_my_feedback, get_pending_feedback
+
+
+@pytest.fixture(scope="module", autouse=True)
+def instrumented():
+    instrument_engine(engine)
+
+
+def make_user(db, uid, role):
+    user = User(
+        firebase_uid=uid,
+        email=f"{uid}@example.com",
+        name=uid,
+        role=role,
+        age=20,
+        university="",
+        specialization="",
+        license_number="",
+        phone_number="",
+        address="",
+    )
+    db.add(user)
+    db.flush()
+    return user
+
+
+def add_bookings(db, student, counselor, count):
+    for day in range(count):
+        booking = Booking(
+            user_id=student.id,
+            counselor_id=counselor.id,
+            preferred_datetime=datetime(2026, 1, 1) + timedelta(days=day),
+            status="completed",
+            issue_description="",
+            notes="",
+        )
+        db.add(booking)
+        db.flush()
+        # Every other session already has feedback
+        if day % 2:
+            db.add(
+                Feedback(
+                    user_id=student.id,
+                    counselor_id=counselor.id,
+                    booking_id=booking.id,
+                    session_date=booking.preferred_datetime,
+                    feedback_type="counselor",
+                    rating=5,
+                    feedback_text="",
+                    helpful_aspects="",
+                    improvement_suggestions="",
+                    counselor_response="",
+                )
+            )
+    db.commit()
+
+
+@pytest.mark.parametrize("bookings", [1, 10, 50])
+def test_pending_feedback_query_count_is_constant(db, bookings):
+    student = make_user(db, "student", UserRole.USER)
+    counselor = make_user(db, "counselor", UserRole.COUNSELOR)
+    add_bookings(db, student, counselor, bookings)
+    # Load the user now, as the auth dependency would have
+    db.refresh(student)
+
+    with track_queries() as stats:
+        pending = asyncio.run(get_pending_feedback(current_user=student, db=db))
+
+    assert len(pending) == (bookings + 1) // 2
+    assert stats.count == 1
+
+
+@pytest.mark.parametrize("counselors", [1, 5, 20])
+def test_my_feedback_query_count_is_constant(db, counselors):
+    student = make_user(db, "student", UserRole.USER)
+    for n in range(counselors):
+        counselor = make_user(db, f"counselor{n}", UserRole.COUNSELOR)
+        add_bookings(db, student, counselor, 4)
+    db.refresh(student)
+
+    with track_queries() as stats:
+        feedback = asyncio.run(get_my_feedback(current_user=student, db=db))
+
+    assert len(feedback) == counselors * 2
+    assert {fb["counselor_name"] for fb in feedback} == {
+        f"counselor{n}" for n in range(counselors)
+    }
+    assert stats.count == 1
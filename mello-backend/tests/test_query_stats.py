@@ -0,0 +1,17 @@
+import pytest
+from database import engine
+from query_stats import instrument_engine, track_queries
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+
+def test_failed_statements_leave_no_state_on_the_connection():
+    instrument_engine(engine)
+    with engine.connect() as connection:
+        with track_queries() as stats:
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM no_such_table"))
+            connection.execute(text("SELECT 1"))
+
+        assert stats.count == 1
+        assert not any(key.startswith("query") for key in connection.info)
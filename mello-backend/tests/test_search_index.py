@@ -0,0 +1,39 @@
+import pytest
+import search_index
+from models import Resource
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_index, "INDEX_PATH", str(tmp_path / "search.sqlite3"))
+    monkeypatch.setattr(search_index, "_local", search_index.threading.local())
+    return search_index
+
+
+def add_resource(index, resource_id, title, description="", category=None):
+    index.index_resource(
+        Resource(
+            id=resource_id, title=title, description=description, category=category
+        )
+    )
+
+
+@pytest.mark.parametrize("word", ["परीक्षा", "परीक्षाओं", "परीक्षाएं"])
+def test_hindi_inflections_share_a_stem(word):
+    assert search_index.tokenize(word) == ["परीक्ष"]
+
+
+def test_search_finds_inflected_hindi_title(index):
+    add_resource(index, 1, "परीक्षाओं का तनाव")
+    assert [hit["id"] for hit in index.search("परीक्षा")] == [1]
+
+
+def test_search_matches_english_prefixes(index):
+    add_resource(index, 2, "Managing exam stress", "Breathing exercises")
+    assert [hit["id"] for hit in index.search("breath")] == [2]
+
+
+def test_search_without_an_index_returns_nothing(index, tmp_path, monkeypatch):
+    # A directory can't be opened as a database
+    monkeypatch.setattr(index, "INDEX_PATH", str(tmp_path))
+    assert index.search("stress") == []
@@ -0,0 +1,31 @@
+import pytest
+from chat_lexicon import classify_message
+from text_matcher import KeywordMatcher
+
+
+@pytest.mark.parametrize(
+    "message, category",
+    [
+        ("I feel stressed", "stress"),
+        ("मैं थका हूँ", "sleep"),
+        ("बहुत थकान है", "sleep"),
+    ],
+)
+def test_overlapping_keywords_score_a_word_once(message, category):
+    _, scores, _ = classify_message(message)
+    assert scores == {category: 1.0}
+
+
+def test_each_word_scores_separately():
+    matcher = KeywordMatcher([("stress", "stress", 1.0), ("stressed", "stress", 1.0)])
+    assert matcher.scan("stressed and stress") == {"stress": 2.0}
+
+
+def test_keywords_match_inside_words():
+    matcher = KeywordMatcher([("overwhelm", "stress", 1.0)])
+    assert matcher.scan("totally overwhelmed") == {"stress": 1.0}
+
+
+def test_phrases_span_words():
+    _, _, escalate = classify_message("Sometimes I want to kill myself")
+    assert escalate
@@ -0,0 +1,81 @@
+"""
+Aho-Corasick multi-pattern matcher.
+
+All patterns are compiled into a single automaton so a text is scanned once,
+left to right, regardless of how many keywords are registered. Matches are
+substring matches, like ``keyword in text``, but a label scores at most once
+per word, so overlapping keywords such as "stress" and "stressed" don't add
+up.
+"""
+
+import unicodedata
+from collections import deque
+
+
+def _is_separator(char: str) -> bool:
+    # Letters, digits and combining marks (Devanagari vowel signs) form words
+    return unicodedata.category(char)[0] in "PSZC"
+
+
+class KeywordMatcher:
+    """Compiled automaton over weighted keywords grouped by label"""
+
+    def __init__(self, patterns):
+        """patterns: iterable of (keyword, label, weight); keywords must be normalised"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]  # node -> [(label, weight, length)] ending there
+        for keyword, label, weight in patterns:
+            if keyword:
+                self._add(keyword, label, weight)
+        self._build_failure_links()
+
+    def _add(self, keyword, label, weight):
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append((label, weight, len(keyword)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # Inherit matches from the longest proper suffix
+                self._output[child] = (
+                    self._output[child] + self._output[self._fail[child]]
+                )
+
+    def scan(self, text: str) -> dict:
+        """Return the summed keyword weight per label, counting each word once"""
+        goto, fail, output = self._goto, self._fail, self._output
+        scores = {}
+        counted = set()  # (label, word the match starts in)
+        word_at = []  # position -> word number
+        word = 0
+        node = 0
+        for position, char in enumerate(text):
+            if _is_separator(char):
+                word += 1
+            word_at.append(word)
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for label, weight, length in output[node]:
+                key = (label, word_at[position - length + 1])
+                if key not in counted:
+                    counted.add(key)
+                    scores[label] = scores.get(label, 0) + weight
+        return scores
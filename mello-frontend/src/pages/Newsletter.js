@@ -24,6 +24,16 @@ const Newsletter = () => {
     }
   };
 
+  const openNewsletter = async (id) => {
+    try {
+      const axios = getAuthenticatedAxios();
+      const response = await axios.get(`/api/newsletters/${id}`);
+      setSelectedNewsletter(response.data);
+    } catch (error) {
+      console.error('Error fetching newsletter:', error);
+    }
+  };
+
   if (isLoading) {
     return (
       <div className="max-w-4xl mx-auto">
@@ -111,11 +121,11 @@ const Newsletter = () => {
                   </div>
                   
                   <p className="text-gray-600 mb-4 line-clamp-3">
-                    {newsletter.content.replace(/<[^>]*>/g, '').substring(0, 200)}...
+                    {newsletter.excerpt}
                   </p>
                   
                   <button
-                    onClick={() => setSelectedNewsletter(newsletter)}
+                    onClick={() => openNewsletter(newsletter.id)}
                     className="inline-flex items-center text-primary-600 hover:text-primary-700 font-medium"
                   >
                     Read more